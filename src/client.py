@@ -0,0 +1,62 @@
+"""Thin client for a resident NeuroOS daemon (python src/main.py --serve).
+
+Usage: python src/client.py open vscode and terminal    (one command)
+       echo "list reminders" | python src/client.py     (one command per stdin line)
+
+Streams the daemon's output as it arrives. Imports nothing from main.py, so it starts in
+about the time of a bare interpreter; exits 2 when no daemon is running.
+"""
+import os, sys, socket
+
+DATA_DIR = os.path.join(os.path.expanduser("~"), "NeuroOS")
+
+def _dotenv(name: str) -> str:
+    """name from the .env main.py loads, read without python-dotenv to keep startup fast."""
+    try:
+        with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), ".env"), "r", encoding="utf-8") as f:
+            for line in f:
+                k, _, v = line.strip().partition("=")
+                if k.strip() == name: return v.strip().strip("'\"")
+    except OSError:
+        pass
+    return ""
+
+SOCKET_PATH = os.environ.get("NEUROOS_SOCKET") or _dotenv("NEUROOS_SOCKET") or os.path.join(DATA_DIR, "neuroos.sock")
+ADDR_FILE = os.path.join(DATA_DIR, "neuroos.addr")
+
+def connect() -> socket.socket:
+    if hasattr(socket, "AF_UNIX"):
+        s = socket.socket(socket.AF_UNIX)
+        s.connect(SOCKET_PATH)
+        return s
+    with open(ADDR_FILE, "r", encoding="utf-8") as f: addr, token = f.read().split()
+    host, port = addr.rsplit(":", 1)
+    s = socket.create_connection((host, int(port)))
+    s.sendall((token + "\n").encode("utf-8"))
+    return s
+
+def run(line: str) -> int:
+    try:
+        s = connect()
+    except OSError:
+        sys.stderr.write("neuroos: no daemon running (start one with: python src/main.py --serve)\n")
+        return 2
+    out = sys.stdout.buffer
+    with s:
+        s.sendall((" ".join(line.split()) + "\n").encode("utf-8"))
+        while True:
+            data = s.recv(65536)
+            if not data: break
+            out.write(data); out.flush()
+    return 0
+
+def main(argv) -> int:
+    if argv: return run(" ".join(argv))
+    rc = 0
+    for line in sys.stdin:
+        if line.strip(): rc = run(line) or rc
+    return rc
+
+if __name__ == "__main__":
+    try: sys.exit(main(sys.argv[1:]))
+    except KeyboardInterrupt: sys.exit(130)
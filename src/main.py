@@ -1,6 +1,12 @@
-import os, re, json, time, difflib, subprocess, shlex, glob, threading, queue, sys, argparse, traceback, platform, wave
-from typing import Dict, Optional, Tuple, List, Any
+import time; _T0 = time.perf_counter()   # --profile-startup measures from here
+import os, re, json, difflib, subprocess, shlex, glob, threading, queue, sys, argparse, traceback, platform, wave, math, heapq, importlib
+from typing import Dict, Optional, Tuple, List, Any, Callable, Iterator
 from pathlib import Path
+from collections import OrderedDict, Counter, deque
+from bisect import bisect_left
+from itertools import chain, islice, count
+from functools import lru_cache, wraps
+from contextlib import contextmanager
 from dotenv import load_dotenv
 
 
@@ -10,6 +16,8 @@ load_dotenv()
 # --------- args / debug ----------
 ap = argparse.ArgumentParser(add_help=False)
 ap.add_argument("--debug", action="store_true")
+ap.add_argument("--serve", action="store_true")   # stay resident for src/client.py (see serve())
+ap.add_argument("--profile-startup", action="store_true")   # print import/init costs at the first prompt
 args, _ = ap.parse_known_args()
 DEBUG = bool(args.debug)
 
@@ -21,32 +29,354 @@ def log_ex(e: BaseException):
     if DEBUG: traceback.print_exc()
     else: print(f"[neuroos] {e.__class__.__name__}: {e}")
 
+# --------- startup profile ----------
+class StartupProfile:
+    """Wall-clock marks from the first line of main.py to the first prompt (--profile-startup),
+    plus what each optional module cost the first time optional_import() loaded it."""
+    def __init__(self, t0: float):
+        self.t0 = t0
+        self.marks: List[Tuple[str, float]] = []
+        self.imports: Dict[str, Optional[float]] = {}   # module -> seconds, None = not available
+    def mark(self, label: str) -> None:
+        self.marks.append((label, time.perf_counter()))
+    def report(self, probe: Tuple[str, ...] = ()) -> None:
+        """Prints the marks, then first-import costs, importing the `probe` modules to measure them."""
+        prev = self.t0
+        for label, t in self.marks:
+            print("[startup] {:<26} {:7.1f} ms  (at {:7.1f} ms)".format(label, (t - prev) * 1e3, (t - self.t0) * 1e3)); prev = t
+        for name in probe: optional_import(name)
+        for name, sec in self.imports.items():
+            print("[startup] first import {:<15} {}".format(name, "not available" if sec is None else f"{sec * 1e3:7.1f} ms"))
+
+STARTUP = StartupProfile(_T0)
+STARTUP.mark("imports, .env, argv")
+
+@lru_cache(maxsize=None)
+def optional_import(name: str) -> Optional[Any]:
+    """An optional module, imported once; None when missing or broken (and not tried again)."""
+    t = time.perf_counter()
+    try: mod = importlib.import_module(name)
+    except Exception as e: dbg(f"optional module {name} unavailable: {e}"); mod = None
+    STARTUP.imports[name] = None if mod is None else time.perf_counter() - t
+    return mod
+
 # --------- dirs / env ----------
 os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
 HOME = str(Path.home())
 DATA_DIR = os.path.join(HOME, "NeuroOS")
-NOTES_DIR = os.path.join(DATA_DIR, "Notes")
-os.makedirs(NOTES_DIR, exist_ok=True)
+NOTES_DIR = os.path.join(DATA_DIR, "Notes")   # created by the first note written
 WORKSPACES_FILE = os.path.join(DATA_DIR, "workspaces.json")
 SYS = platform.system().lower()
 
+# --------- tracing ----------
+TRACE_FILE = os.path.join(DATA_DIR, "trace.jsonl")
+
+class _Span:
+    __slots__ = ("tracer", "name", "args", "t")
+    def __init__(self, tracer: "Tracer", name: str, args: Dict[str, Any]):
+        self.tracer, self.name, self.args = tracer, name, args
+    def __enter__(self):
+        self.t = time.perf_counter(); return self
+    def __exit__(self, et, ev, tb):
+        if et is not None: self.args["error"] = et.__name__
+        self.tracer._emit(self.name, self.t + self.tracer._epoch, time.perf_counter() - self.t, self.args)
+        return False
+
+class Tracer:
+    """Timed spans for `trace on`, as Chrome trace-event "X" records: kept in a ring buffer
+    (for `trace dump`, which writes a file chrome://tracing and Perfetto open) and appended
+    to a JSON-lines file rotated at max_bytes. While off, a span is a shared no-op context
+    and a traced() function pays one attribute check."""
+    def __init__(self, path: str, max_bytes: int, keep: int = 20000):
+        self.path, self.max_bytes = path, max_bytes
+        self.on = False
+        self._buf: deque = deque(maxlen=keep)
+        self._lock = threading.Lock(); self._fh = None; self._size = 0
+        self._epoch = time.time() - time.perf_counter()
+        self._null = _NullSpan()
+    def enable(self, on: bool) -> None:
+        with self._lock:
+            self.on = on
+            if not on and self._fh: self._fh.close(); self._fh = None
+    def span(self, name: str, **args: Any):
+        return _Span(self, name, args) if self.on else self._null
+    def add(self, name: str, start: float, seconds: float, **args: Any) -> None:
+        """A span that has already happened (start in epoch seconds)."""
+        if self.on: self._emit(name, start, seconds, args)
+    def _emit(self, name: str, start: float, seconds: float, args: Dict[str, Any]) -> None:
+        ev = {"name": name, "ph": "X", "ts": round(start * 1e6), "dur": round(seconds * 1e6), "pid": os.getpid(),
+              "tid": threading.get_ident(), "args": args}
+        with self._lock:
+            self._buf.append((threading.current_thread().name, ev))
+            if not self.on: return
+            try:
+                if self._fh is None:
+                    Path(os.path.dirname(self.path)).mkdir(parents=True, exist_ok=True)
+                    self._fh = open(self.path, "a", encoding="utf-8"); self._size = os.path.getsize(self.path)
+                line = json.dumps(ev, default=str) + "\n"
+                self._fh.write(line); self._size += len(line)
+                if self._size > self.max_bytes: self._rotate()
+            except OSError as e:
+                dbg(f"trace write failed: {e}")
+    def _rotate(self) -> None:
+        self._fh.close(); self._fh = None
+        if os.path.exists(self.path + ".1"): os.replace(self.path + ".1", self.path + ".2")
+        os.replace(self.path, self.path + ".1")
+    def dump(self, path: str) -> int:
+        """Writes the buffered spans as a Chrome trace-event file; returns how many."""
+        with self._lock:
+            items = list(self._buf)
+            if self._fh: self._fh.flush()
+        threads = {ev["tid"]: tname for tname, ev in items}
+        meta = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid, "args": {"name": n}} for tid, n in threads.items()]
+        Path(os.path.dirname(path)).mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": meta + [ev for _, ev in items], "displayTimeUnit": "ms"}, f, default=str)
+        return len(items)
+    def summary(self, top: int = 10) -> List[Tuple[str, int, float, float]]:
+        """(name, count, total ms, max ms) of the buffered spans, largest total first."""
+        with self._lock: items = [ev for _, ev in self._buf]
+        agg: Dict[str, List[float]] = {}
+        for ev in items:
+            a = agg.setdefault(ev["name"], [0, 0.0, 0.0]); d = ev["dur"] / 1e3
+            a[0] += 1; a[1] += d; a[2] = max(a[2], d)
+        return sorted(((n, int(c), t, m) for n, (c, t, m) in agg.items()), key=lambda r: -r[2])[:top]
+
+class _NullSpan:
+    __slots__ = ()
+    def __enter__(self): return self
+    def __exit__(self, et, ev, tb): return False
+
+TRACE = Tracer(TRACE_FILE, int(float(os.environ.get("NEUROOS_TRACE_MAX_MB", "5")) * 1e6))
+TRACE.on = os.environ.get("NEUROOS_TRACE", "0") == "1"
+
+def traced(name: str, attrs: Optional[Callable[..., Dict[str, Any]]] = None):
+    """Decorator: a TRACE span around each call; for a generator function, around its iteration.
+    attrs(*args, **kwargs) adds span arguments (only computed while tracing)."""
+    def deco(fn):
+        if fn.__code__.co_flags & 0x20:   # CO_GENERATOR
+            @wraps(fn)
+            def gen(*a, **k):
+                if not TRACE.on: return (yield from fn(*a, **k))
+                with TRACE.span(name, **(attrs(*a, **k) if attrs else {})): return (yield from fn(*a, **k))
+            return gen
+        @wraps(fn)
+        def call(*a, **k):
+            if not TRACE.on: return fn(*a, **k)
+            with TRACE.span(name, **(attrs(*a, **k) if attrs else {})): return fn(*a, **k)
+        return call
+    return deco
+
+# --------- metrics ----------
+# 100 us .. 75 s at 1, 1.5, 2, 3, 5, 7.5 per decade: a bucket quantile is within ~25% of the exact one
+LATENCY_BUCKETS = tuple(round(m * 10.0 ** e, 6) for e in range(-4, 2) for m in (1, 1.5, 2, 3, 5, 7.5))
+
+class Metrics:
+    """Counters, gauges and fixed-bucket histograms kept in process, for the `metrics` command
+    and the Prometheus text endpoint (serve_metrics). A series is a metric name plus labels;
+    an update is a dict lookup under one lock. Probes are gauges read only when scraped."""
+    def __init__(self):
+        self._lock = threading.Lock(); self.t0 = time.time()
+        self._defs: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {}   # name -> (kind, help, buckets)
+        self._vals: Dict[str, Dict[Tuple[Tuple[str, str], ...], Any]] = {}
+        self._probes: Dict[str, Callable[[], float]] = {}
+    def define(self, name: str, kind: str, help: str, buckets: Tuple[float, ...] = ()) -> None:
+        self._defs[name] = (kind, help, tuple(sorted(buckets))); self._vals.setdefault(name, {})
+    def probe(self, name: str, help: str, fn: Callable[[], float], kind: str = "gauge") -> None:
+        """A metric read from fn when scraped; kind="counter" for a running total kept elsewhere."""
+        self.define(name, kind, help); self._probes[name] = fn
+    def inc(self, name: str, n: float = 1, **labels: str) -> None:
+        key = tuple(sorted(labels.items())) if labels else ()
+        with self._lock:
+            v = self._vals[name]; v[key] = v.get(key, 0) + n
+    def set(self, name: str, value: float, **labels: str) -> None:
+        key = tuple(sorted(labels.items())) if labels else ()
+        with self._lock: self._vals[name][key] = value
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        buckets = self._defs[name][2]; key = tuple(sorted(labels.items())) if labels else ()
+        i = bisect_left(buckets, value)   # first bucket with le >= value; len(buckets) is +Inf
+        with self._lock:
+            h = self._vals[name].get(key)
+            if h is None: h = self._vals[name][key] = [[0] * (len(buckets) + 1), 0.0, 0]   # counts, sum, count
+            h[0][i] += 1; h[1] += value; h[2] += 1
+    def _merged(self, name: str, labels: Dict[str, str]) -> Tuple[List[int], float, int]:
+        """One histogram from every series of name matching labels."""
+        want = set(labels.items()); counts = [0] * (len(self._defs[name][2]) + 1); total = 0.0; n = 0
+        with self._lock:
+            for key, (c, s, k) in self._vals[name].items():
+                if want <= set(key):
+                    counts = [a + b for a, b in zip(counts, c)]; total += s; n += k
+        return counts, total, n
+    def quantile(self, name: str, q: float, **labels: str) -> Optional[float]:
+        """Estimated q-quantile of a histogram (linear within the bucket, like histogram_quantile);
+        None before the first observation."""
+        buckets = self._defs[name][2]; counts, _, n = self._merged(name, labels)
+        if not n: return None
+        rank = q * n; seen = 0
+        for i, c in enumerate(counts):
+            if c and seen + c >= rank:
+                if i == len(buckets): return buckets[-1]   # +Inf bucket: the highest bound is all we know
+                lo = buckets[i - 1] if i else 0.0
+                return lo + (buckets[i] - lo) * (rank - seen) / c
+            seen += c
+        return buckets[-1]
+    def value(self, name: str, **labels: str) -> float:
+        """Sum of a counter or gauge over the series matching labels (a probe is read)."""
+        if name in self._probes: return self._probes[name]()
+        want = set(labels.items())
+        with self._lock: return sum(v for k, v in self._vals[name].items() if want <= set(k))
+    def series(self, name: str) -> List[Tuple[Dict[str, str], Any]]:
+        with self._lock: return [(dict(k), v) for k, v in self._vals[name].items()]
+    def prometheus(self) -> str:
+        """Text exposition format 0.0.4."""
+        out: List[str] = []
+        for name, (kind, help, buckets) in self._defs.items():
+            out += [f"# HELP {name} {help}", f"# TYPE {name} {kind}"]
+            if name in self._probes:
+                try: out.append(f"{name} {_num(self._probes[name]())}")
+                except Exception as e: dbg(f"metric probe {name}: {e}")
+                continue
+            for labels, v in sorted(self.series(name), key=lambda s: sorted(s[0].items())):
+                if kind != "histogram":
+                    out.append(f"{name}{_labels(labels)} {_num(v)}"); continue
+                counts, total, n = v; cum = 0
+                for le, c in zip(buckets + (math.inf,), counts):
+                    cum += c; out.append(f"{name}_bucket{_labels(dict(labels, le=_num(le)))} {cum}")
+                out += [f"{name}_sum{_labels(labels)} {_num(total)}", f"{name}_count{_labels(labels)} {n}"]
+        return "\n".join(out) + "\n"
+    def summary_lines(self) -> List[str]:
+        up = time.time() - self.t0; n = self.value("neuroos_commands_total")
+        lines = ["uptime {:.0f}s | {:.0f} commands ({:.3f}/s) | {:.0f} errors".format(up, n, n / up if up > 0 else 0.0, self.value("neuroos_command_errors_total"))]
+        top = Counter()
+        for labels, v in self.series("neuroos_commands_total"): top[labels.get("intent", "")] += v
+        if top: lines.append("intents: " + ", ".join(f"{k}={v:.0f}" for k, v in top.most_common(8)))
+        for name, (kind, _, _) in self._defs.items():
+            if kind != "histogram": continue
+            _, total, count = self._merged(name, {})
+            if not count: continue
+            scale, unit = (1000.0, " ms") if name.endswith("_seconds") else (1.0, "")
+            qs = " ".join("p{}={:.2f}{}".format(int(q * 100), self.quantile(name, q) * scale, unit) for q in (0.5, 0.95, 0.99))
+            lines.append("{:<28} n={:<6d} {} mean={:.2f}{}".format(name[len("neuroos_"):], count, qs, total / count * scale, unit))
+        gauges = []
+        for name in self._probes:
+            try: gauges.append("{}={}".format(name[len("neuroos_"):], _num(self._probes[name]())))
+            except Exception: pass
+        if gauges: lines.append(" ".join(gauges))
+        fails = [(l, v) for l, v in self.series("neuroos_adapter_calls_total") if l.get("result") != "ok"]
+        if fails: lines.append("adapter failures: " + ", ".join(f"{l.get('method')} {l.get('result')}={v:.0f}" for l, v in fails))
+        return lines
+
+def _num(v: float) -> str:
+    if v == math.inf: return "+Inf"
+    return str(int(v)) if float(v).is_integer() and abs(v) < 1e15 else repr(float(v))
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels: return ""
+    esc = lambda s: str(s).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in sorted(labels.items(), key=lambda kv: (kv[0] == "le", kv[0]))) + "}"
+
+def metered(name: str, **labels: str):
+    """Decorator: counts calls into counter name with result="ok", "false" (returned False) or "error"."""
+    def deco(fn):
+        @wraps(fn)
+        def call(*a, **k):
+            try: r = fn(*a, **k)
+            except Exception:
+                METRICS.inc(name, result="error", **labels); raise
+            METRICS.inc(name, result="false" if r is False else "ok", **labels); return r
+        return call
+    return deco
+
+def _probe_q(q_name: str) -> Callable[[], float]:
+    return lambda: getattr(VOICE, q_name).qsize()
+
+METRICS = Metrics()
+METRICS.define("neuroos_commands_total", "counter", "Commands run, by intent (none when not understood).")
+METRICS.define("neuroos_command_errors_total", "counter", "Commands that raised.")
+METRICS.define("neuroos_parse_seconds", "histogram", "parse_intent latency.", LATENCY_BUCKETS)
+METRICS.define("neuroos_command_seconds", "histogram", "Parse plus dispatch latency of a command, by intent.", LATENCY_BUCKETS)
+METRICS.define("neuroos_adapter_calls_total", "counter", "OS adapter calls, by method and result.")
+METRICS.define("neuroos_voice_queue_depth", "histogram", "seg_q depth seen by each new segment.", (0, 1, 2, 4, 8, 16, 32))
+METRICS.define("neuroos_voice_decode_seconds", "histogram", "Whisper decode time per batch of final segments.", LATENCY_BUCKETS)
+METRICS.define("neuroos_voice_rtf", "histogram", "Whisper real-time factor (decode time / audio time).", (0.05, 0.1, 0.2, 0.3, 0.5, 0.75, 1.0, 1.5, 2.0, 4.0))
+METRICS.probe("neuroos_voice_seg_queue", "Segments waiting for a decoder.", _probe_q("seg_q"))
+METRICS.probe("neuroos_voice_txt_queue", "Transcripts waiting for the consumer.", _probe_q("txt_q"))
+METRICS.probe("neuroos_voice_dropped_total", "Segments dropped on a full seg_q.", lambda: VOICE.n_dropped, "counter")
+METRICS.probe("neuroos_voice_merged_total", "Segments merged on a full seg_q.", lambda: VOICE.n_merged, "counter")
+METRICS.define("neuroos_llm_tokens_total", "counter", "Tokens generated.")
+METRICS.define("neuroos_llm_ttft_seconds", "histogram", "LLM time to first token.", LATENCY_BUCKETS)
+METRICS.define("neuroos_llm_tokens_per_second", "histogram", "LLM decode speed after the first token.", (1, 2, 5, 10, 20, 30, 50, 75, 100, 150, 200, 400))
+METRICS.probe("neuroos_llm_jobs_waiting", "LLM requests queued.", lambda: LLM_JOBS.waiting())
+METRICS.define("neuroos_reminders_fired_total", "counter", "Reminders fired, by whether they were missed.")
+METRICS.probe("neuroos_reminders_pending", "Reminders scheduled.", lambda: REMINDERS.count())
+
+def serve_metrics(port: int, host: str = "127.0.0.1"):
+    """GET /metrics in Prometheus text format on a daemon thread; returns the server."""
+    from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics": self.send_error(404); return
+            body = METRICS.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body))); self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *a): pass
+    srv = ThreadingHTTPServer((host, port), MetricsHandler); srv.daemon_threads = True
+    threading.Thread(target=srv.serve_forever, name="neuroos-metrics", daemon=True).start()
+    return srv
+
 # --------- misc helpers ----------
 ANSI_ESC = re.compile(r"\x1B\[[0-?]*[ -/]*[@-~]")
+REPEATED_CHARS = re.compile(r"(.)\1{2,}")
+CAMEL_BOUNDARY = re.compile(r"([a-z])([A-Z])")
+DASHES_TO_SPACE = str.maketrans({"_": " ", "-": " "})
+TYPO_FIXES = {
+    "opennn":"open","oppen":"open","openn":"open",
+    "reming":"remind","remeinder":"reminder",
+    "coede":"code","codee":"code","codde":"code",
+    "visualstudio":"visual studio","vs  code":"vs code",
+    "skleep":"sleep"
+}
 
-def normalize_text(raw: str) -> str:
-    s = ANSI_ESC.sub("", raw)
-    s = re.sub(r"(.)\1{2,}", r"\1", s)
-    s = s.replace("_"," ").replace("-"," ")
-    s = re.sub(r"([a-z])([A-Z])", r"\1 \2", s).lower()
-    for a,b in {
-        "opennn":"open","oppen":"open","openn":"open",
-        "reming":"remind","remeinder":"reminder",
-        "coede":"code","codee":"code","codde":"code",
-        "visualstudio":"visual studio","vs  code":"vs code",
-        "skleep":"sleep"
-    }.items():
+def _typos_sequential(s: str) -> str:
+    for a,b in TYPO_FIXES.items():
         s = s.replace(a,b)
-    return re.sub(r"\s+"," ", s).strip()
+    return s
+
+def _typo_regex(table: Dict[str, str]) -> "re.Pattern[str]":
+    return re.compile("|".join(re.escape(k) for k in sorted(table, key=len, reverse=True)))
+
+def _build_typo_table() -> Dict[str, str]:
+    """TYPO_FIXES plus composed keys so one longest-first alternation pass gives the same
+    result as replacing the fixes one after another (e.g. "oppenn" -> "openn" -> "open")."""
+    table = dict(TYPO_FIXES); cands = set(TYPO_FIXES)
+    for a, out in TYPO_FIXES.items():
+        for b in TYPO_FIXES:
+            for x in (a, out):   # b overlapping a typo, or overlapping what it gets fixed into
+                for off in range(1 - len(b), len(x)):
+                    lo, hi = max(0, off), min(len(x), off + len(b))
+                    if x[lo:hi] == b[lo-off:hi-off]: cands.add(b[:max(0, -off)] + a + b[hi-off:])
+    changed = True
+    while changed:
+        changed = False; rx = _typo_regex(table)
+        for c in sorted(cands, key=len):
+            want = _typos_sequential(c)
+            if rx.sub(lambda m: table[m.group(0)], c) != want and table.get(c) != want:
+                table[c] = want; changed = True
+    return table
+
+TYPO_TABLE = _build_typo_table()
+TYPO_RX = _typo_regex(TYPO_TABLE)
+
+@lru_cache(maxsize=4096)
+@traced("normalize_text")
+def normalize_text(raw: str) -> str:
+    s = ANSI_ESC.sub("", raw) if "\x1b" in raw else raw
+    s = REPEATED_CHARS.sub(r"\1", s)
+    s = CAMEL_BOUNDARY.sub(r"\1 \2", s.translate(DASHES_TO_SPACE)).lower()
+    s = TYPO_RX.sub(lambda m: TYPO_TABLE[m.group(0)], s)
+    return " ".join(s.split())
 
 def detect_url(s: str) -> Optional[str]:
     m = re.search(r"\b(https?://[^\s]+)\b", s, re.I)
@@ -54,9 +384,10 @@ def detect_url(s: str) -> Optional[str]:
 
 # --------- notifications & TTS ----------
 def notify(title: str, message: str):
+    plyer = optional_import("plyer")
+    if plyer is None: return
     try:
-        from plyer import notification
-        notification.notify(title=title, message=message, timeout=5)
+        plyer.notification.notify(title=title, message=message, timeout=5)
     except Exception as e:
         dbg(f"notify failed: {e}")
 
@@ -87,6 +418,7 @@ def speak(msg: str):
         pass
 
 # --------- clipboard / selection ----------
+@traced("osascript")
 def osa(script: str) -> None:
     try: subprocess.run(["osascript", "-e", script], check=False)
     except Exception as e: log_ex(e)
@@ -98,21 +430,291 @@ def copy_selection():
             osa('tell application "System Events" to keystroke "c" using {command down}')
             time.sleep(0.15)
         else:
-            import pyautogui
+            pyautogui = optional_import("pyautogui")
+            if pyautogui is None: raise RuntimeError("pyautogui not available")
             pyautogui.hotkey('ctrl','c')
             time.sleep(0.15)
-        import pyperclip
-        return pyperclip.paste() or ""
     except Exception as e:
         dbg(f"copy_selection failed: {e}")
+    pyperclip = optional_import("pyperclip")
+    try:
+        return (pyperclip.paste() or "") if pyperclip else ""
+    except Exception:
+        return ""
+
+# --------- app name index ----------
+class AppNameIndex:
+    """Shared fuzzy lookup over app names, grouped by source ("phrases", "adapter", "installed").
+
+    Names are kept lowercased in insertion order with a padded-trigram inverted index per
+    source. Small sources are scored exhaustively (exactly what difflib did before); large
+    ones (installed apps) are first shortlisted by shared trigrams. Results go through a
+    bounded LRU that is dropped whenever a source changes.
+    """
+    SHORTLIST_MIN = 64   # below this many names, score every name
+    SHORTLIST_MAX = 48   # best trigram hits handed to difflib for large sources
+    def __init__(self, cache_size: int = 1024):
+        self._lock = threading.Lock()
+        self._names: Dict[str, List[str]] = {}
+        self._display: Dict[str, Dict[str, str]] = {}
+        self._grams: Dict[str, Dict[str, List[int]]] = {}
+        self._cache: "OrderedDict[Tuple[Any, ...], Optional[str]]" = OrderedDict()
+        self._cache_size = cache_size
+        self.hits = 0; self.misses = 0
+    @staticmethod
+    def _trigrams(s: str) -> set:
+        p = f" {s} "
+        return {p[i:i+3] for i in range(len(p) - 2)}
+    def add(self, source: str, names) -> None:
+        with self._lock:
+            lst = self._names.setdefault(source, []); disp = self._display.setdefault(source, {})
+            grams = self._grams.setdefault(source, {})
+            for n in names:
+                k = (n or "").strip().lower()
+                if not k or k in disp: continue
+                disp[k] = n; lst.append(k)
+                for g in self._trigrams(k): grams.setdefault(g, []).append(len(lst) - 1)
+            self._cache.clear()
+    def replace(self, source: str, names) -> None:
+        with self._lock:
+            self._names.pop(source, None); self._display.pop(source, None); self._grams.pop(source, None)
+        self.add(source, names)
+    def names(self, source: str) -> List[str]:
+        return list(self._names.get(source, ()))
+    def has(self, source: str, key: str) -> bool:
+        return key in self._display.get(source, {})
+    def display(self, source: str, key: str) -> str:
+        return self._display.get(source, {}).get(key, key)
+    def _shortlist(self, source: str, s: str, cutoff: float) -> List[str]:
+        names = self._names.get(source, [])
+        if len(names) < self.SHORTLIST_MIN: return names
+        grams = self._grams[source]
+        hits = Counter(chain.from_iterable(grams.get(g, ()) for g in self._trigrams(s)))
+        ls = len(s)
+        # ratio() can never beat 2*min(len)/(sum of lens); drop what cannot reach cutoff
+        ok = [i for i, _ in hits.most_common() if 2 * min(ls, len(names[i])) / (ls + len(names[i])) >= cutoff]
+        return [names[i] for i in sorted(ok[:self.SHORTLIST_MAX])]
+    def _cached(self, key: Tuple[Any, ...], compute: Callable[[], Optional[str]]) -> Optional[str]:
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key); self.hits += 1
+                return self._cache[key]
+        val = compute()
+        with self._lock:
+            self.misses += 1
+            self._cache[key] = val
+            if len(self._cache) > self._cache_size: self._cache.popitem(last=False)
+        return val
+    def close_match(self, s: str, source: str, cutoff: float = 0.72) -> Optional[str]:
+        """difflib.get_close_matches(s, names, n=1, cutoff) over one source; returns the lowercased name."""
+        def compute():
+            best = difflib.get_close_matches(s, self._shortlist(source, s, cutoff), n=1, cutoff=cutoff)
+            return best[0] if best else None
+        return self._cached(("close", source, s, cutoff), compute)
+    def phrase_match(self, hay: str, source: str, cutoff: float = 0.70) -> Optional[str]:
+        """First name contained in hay, else the best SequenceMatcher ratio >= cutoff."""
+        def compute():
+            for c in self._names.get(source, ()):
+                if c in hay: return c
+            best, score = None, 0.0
+            for c in self._shortlist(source, hay, cutoff):
+                r = difflib.SequenceMatcher(None, hay, c).ratio()
+                if r > score: best, score = c, r
+            return best if score >= cutoff else None
+        return self._cached(("phrase", source, hay, cutoff), compute)
+
+APP_NAMES = AppNameIndex()
+
+# --------- installed app catalog ----------
+APPS_CATALOG_FILE = os.path.join(DATA_DIR, "apps.json")
+
+class AppCatalog:
+    """On-disk catalog of launchable programs under DATA_DIR.
+
+    Scans PATH executables ("bin"), XDG .desktop entries ("desktop") and macOS app
+    folders ("mac"). Each scanned directory is stored with its mtime, so a refresh only
+    re-lists directories that changed. start() loads the last catalog from disk and
+    refreshes in a background thread. A lookup that misses falls back to shutil.which and
+    schedules another refresh (at most every REFRESH_MIN_S), so programs installed while
+    NeuroOS runs are found too.
+    """
+    VERSION = 1
+    REFRESH_MIN_S = 30.0
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._dirs: Dict[str, Dict[str, Any]] = {}
+        self._exe: Dict[str, str] = {}
+        self._desktop: Dict[str, List[str]] = {}
+        self._mac: Dict[str, str] = {}
+        self.ready = threading.Event()   # set once a refresh against the live filesystem finished
+        self._thread: Optional[threading.Thread] = None
+        self._last_start = float("-inf")
+
+    # ---- roots ----
+    def _roots(self) -> List[Tuple[str, str]]:
+        roots: List[Tuple[str, str]] = []
+        for d in os.environ.get("PATH", "").split(os.pathsep):
+            if d: roots.append(("bin", os.path.abspath(os.path.expanduser(d))))
+        if "darwin" in SYS or "mac" in SYS:
+            for d in ("/Applications", "/System/Applications", os.path.join(HOME, "Applications")):
+                roots.append(("mac", d))
+        elif "windows" not in SYS:
+            data_home = os.environ.get("XDG_DATA_HOME") or os.path.join(HOME, ".local", "share")
+            data_dirs = (os.environ.get("XDG_DATA_DIRS") or "/usr/local/share:/usr/share").split(":")
+            for d in [data_home] + data_dirs:
+                if d: roots.append(("desktop", os.path.join(d, "applications")))
+        seen, out = set(), []
+        for kind, d in roots:
+            if d not in seen: seen.add(d); out.append((kind, d))
+        return out
+
+    # ---- scanners ----
+    @staticmethod
+    def _scan_bin(d: str) -> Dict[str, Any]:
+        names = []
+        with os.scandir(d) as it:
+            for e in it:
+                try:
+                    if e.is_file() and os.access(e.path, os.X_OK): names.append(e.name)
+                except OSError:
+                    continue
+        return {"entries": sorted(names)}
+    @staticmethod
+    def _parse_desktop(path: str) -> Optional[Tuple[str, List[str]]]:
+        name = exe = None; in_entry = False
+        with open(path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.strip()
+                if line.startswith("["): in_entry = (line == "[Desktop Entry]"); continue
+                if not in_entry or "=" not in line: continue
+                k, v = line.split("=", 1)
+                if k == "Name": name = v
+                elif k == "Exec": exe = v
+                elif k in ("NoDisplay", "Hidden") and v.lower() == "true": return None
+                elif k == "Type" and v != "Application": return None
+        if not name or not exe: return None
+        try: argv = [a for a in shlex.split(exe) if not re.fullmatch(r"%[a-zA-Z]", a)]
+        except ValueError: return None
+        return (name, argv) if argv else None
+    def _scan_desktop(self, d: str) -> Dict[str, Any]:
+        entries: Dict[str, List[str]] = {}
+        for p in sorted(glob.glob(os.path.join(d, "*.desktop"))):
+            try: parsed = self._parse_desktop(p)
+            except OSError: continue
+            if parsed and parsed[0] not in entries: entries[parsed[0]] = parsed[1]
+        return {"entries": entries}
+    @staticmethod
+    def _scan_mac(d: str, nested: bool) -> Dict[str, Any]:
+        apps: Dict[str, str] = {}; subdirs: List[str] = []
+        with os.scandir(d) as it:
+            for e in sorted(it, key=lambda e: e.name):
+                if e.name.endswith(".app"): apps.setdefault(e.name[:-4], e.path)
+                elif nested and e.is_dir(): subdirs.append(e.path)
+        return {"entries": apps, "subdirs": subdirs}
+    def _scan(self, kind: str, d: str) -> Dict[str, Any]:
+        if kind == "bin": return self._scan_bin(d)
+        if kind == "desktop": return self._scan_desktop(d)
+        return self._scan_mac(d, nested=(kind == "mac" and d == "/Applications"))
+
+    # ---- persistence ----
+    def load(self) -> None:
         try:
-            import pyperclip
-            return pyperclip.paste() or ""
-        except Exception:
-            return ""
+            with open(self.path, "r", encoding="utf-8") as f: data = json.load(f) or {}
+        except (OSError, ValueError):
+            return
+        if data.get("version") != self.VERSION: return
+        with self._lock:
+            self._dirs = data.get("dirs") or {}
+            self._rebuild()
+    def save(self) -> None:
+        with self._lock:
+            data = {"version": self.VERSION, "dirs": self._dirs}
+        Path(os.path.dirname(self.path)).mkdir(parents=True, exist_ok=True)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f: json.dump(data, f)
+        os.replace(tmp, self.path)
+
+    def refresh(self) -> int:
+        """Re-lists directories whose mtime changed; returns how many were rescanned."""
+        changed = 0
+        with self._lock: old = dict(self._dirs)
+        new: Dict[str, Dict[str, Any]] = {}
+        pending = self._roots()
+        while pending:
+            kind, d = pending.pop(0)
+            try: mtime = os.stat(d).st_mtime
+            except OSError: continue
+            prev = old.get(d)
+            if prev and prev.get("kind") == kind and prev.get("mtime") == mtime:
+                new[d] = prev
+            else:
+                try: entry = self._scan(kind, d)
+                except OSError as e: dbg(f"catalog scan {d}: {e}"); continue
+                entry.update(kind=kind, mtime=mtime); new[d] = entry; changed += 1
+            if d == "/Applications" and kind == "mac":   # one level of folders (e.g. Utilities), like /Applications/*/*.app
+                pending.extend(("mac_sub", sd) for sd in new[d].get("subdirs", []) if sd not in new)
+        if changed or set(new) != set(old):
+            with self._lock:
+                self._dirs = new; self._rebuild()
+            try: self.save()
+            except OSError as e: dbg(f"catalog save failed: {e}")
+        self.ready.set()
+        dbg(f"app catalog: {len(new)} dirs, {changed} rescanned")
+        return changed
+    def _rebuild(self) -> None:
+        exe: Dict[str, str] = {}; desktop: Dict[str, List[str]] = {}; mac: Dict[str, str] = {}
+        win = "windows" in SYS
+        for d, entry in self._dirs.items():   # dict order == PATH order, first hit wins like which()
+            kind = entry.get("kind")
+            if kind == "bin":
+                for n in entry.get("entries", ()): exe.setdefault(n.lower() if win else n, os.path.join(d, n))
+            elif kind == "desktop":
+                for n, argv in (entry.get("entries") or {}).items(): desktop.setdefault(n, argv)
+            else:
+                for n, p in (entry.get("entries") or {}).items(): mac.setdefault(n, p)
+        self._exe, self._desktop, self._mac = exe, desktop, mac
+        APP_NAMES.replace("installed", list(mac) + list(desktop))
+
+    def start(self, load: bool = True) -> None:
+        """Loads the saved catalog (cheap; load=False when already done) and refreshes it in the background."""
+        if self._thread and self._thread.is_alive(): return
+        if load: self.load()
+        self._last_start = time.monotonic()
+        self._thread = threading.Thread(target=self._refresh_bg, name="app-catalog", daemon=True)
+        self._thread.start()
+    def _refresh_bg(self) -> None:
+        try: self.refresh()
+        except Exception as e: log_ex(e)
+
+    # ---- lookups ----
+    def which(self, cmd: str) -> Optional[str]:
+        if os.sep in cmd or (os.altsep and os.altsep in cmd):
+            return cmd if os.access(cmd, os.X_OK) else None
+        key = cmd.lower() if "windows" in SYS else cmd
+        hit = self._exe.get(key)
+        if not hit and "windows" in SYS and not os.path.splitext(key)[1]:
+            for ext in os.environ.get("PATHEXT", ".EXE;.BAT;.CMD").lower().split(";"):
+                hit = self._exe.get(key + ext)
+                if hit: break
+        if hit: return hit
+        if self.ready.is_set() and time.monotonic() - self._last_start >= self.REFRESH_MIN_S:
+            self.start(load=False)   # installed since the last scan? the next lookup will know
+        from shutil import which
+        return which(cmd)
+    def desktop_exec(self, name: str) -> Optional[List[str]]:
+        return self._desktop.get(name)
+
+APP_CATALOG = AppCatalog(APPS_CATALOG_FILE)
 
 # --------- OS adapters (mac / linux / win) ----------
 class OSAdapter:
+    def __init_subclass__(cls, **kw):
+        super().__init_subclass__(**kw)
+        for n, fn in list(vars(cls).items()):   # every public adapter method is a span, e.g. "LinuxAdapter.open_app"
+            if not n.startswith("_") and isinstance(fn, type(traced)):
+                fn = metered("neuroos_adapter_calls_total", method=f"{cls.__name__}.{n}")(fn)   # result=ok|false|error
+                setattr(cls, n, traced(f"{cls.__name__}.{n}", lambda self, *a, **k: {"arg": str(a[0])[:80]} if a else {})(fn))
     def open_app(self, user_name:str)->bool: raise NotImplementedError
     def open_url(self, url:str)->None: raise NotImplementedError
     def simple_text_doc(self, text:str)->None: raise NotImplementedError
@@ -136,27 +738,11 @@ class MacAdapter(OSAdapter):
         "Reminders":"com.apple.reminders", "Preview":"com.apple.Preview",
         "TextEdit":"com.apple.TextEdit", "Mail":"com.apple.mail", "Finder":"com.apple.finder",
     }
-    _APP_CACHE = None
-    def _list_apps(self)->List[str]:
-        if MacAdapter._APP_CACHE is not None: return MacAdapter._APP_CACHE
-        paths = ["/Applications/*.app","/Applications/*/*.app","/System/Applications/*.app", os.path.join(HOME,"Applications","*.app")]
-        names, seen = [], set()
-        for pat in paths:
-            for ap in glob.glob(pat):
-                name = os.path.splitext(os.path.basename(ap))[0]
-                if name not in seen: names.append(name); seen.add(name)
-        MacAdapter._APP_CACHE = names
-        return names
     def _resolve(self, user_name:str)->Optional[str]:
         s = (user_name or "").strip().lower()
         if s in self.APP_CANONICALS: return self.APP_CANONICALS[s]
-        for n in self._list_apps():
-            if n.lower()==s: return n
-        best = difflib.get_close_matches(s,[n.lower() for n in self._list_apps()],n=1,cutoff=0.72)
-        if best:
-            for n in self._list_apps():
-                if n.lower()==best[0]: return n
-        return None
+        best = s if APP_NAMES.has("installed", s) else APP_NAMES.close_match(s, "installed", 0.72)
+        return APP_NAMES.display("installed", best) if best else None
     def open_app(self, user_name:str)->bool:
         name = self._resolve(user_name) or user_name
         try:
@@ -207,10 +793,7 @@ class MacAdapter(OSAdapter):
             ''' % (title_e, title_e, body_e, body_e))
         except Exception as e:
             dbg("notes_append fallback: {}".format(e))
-            path = os.path.join(NOTES_DIR, f"{title}.md")
-            with open(path,"a") as f:
-                f.write(f"\n\n---\n{time.ctime()}\n{body}\n")
-            subprocess.Popen(["open",path])
+            NOTE_WRITER.append(title, body, lambda path: subprocess.Popen(["open",path]))
     def mail_draft(self, to_addr:Optional[str], subject:str, body:str)->None:
         try:
             subj, bod, addr = esc_as(subject), esc_as(body), esc_as(to_addr or "")
@@ -240,8 +823,7 @@ class LinuxAdapter(OSAdapter):
         "mail": ["thunderbird","evolution"], "music": ["vlc","rhythmbox","spotify"],
     }
     def _which(self, cmd:str)->Optional[str]:
-        from shutil import which
-        return which(cmd)
+        return APP_CATALOG.which(cmd)
     def open_app(self, user_name:str)->bool:
         s = (user_name or "").strip().lower()
         alts = self.APP_ALTS.get(s) or [s]
@@ -250,6 +832,14 @@ class LinuxAdapter(OSAdapter):
             if exe:
                 try: subprocess.Popen([exe]); return True
                 except Exception: continue
+        # not a command name: try installed .desktop entries by display name
+        best = APP_NAMES.close_match(s, "installed", 0.72)
+        argv = APP_CATALOG.desktop_exec(APP_NAMES.display("installed", best)) if best else None
+        if argv:
+            exe = self._which(argv[0])
+            if exe:
+                try: subprocess.Popen([exe] + argv[1:]); return True
+                except Exception: pass
         return False
     def open_url(self, url:str)->None:
         try: subprocess.Popen(["xdg-open", url], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
@@ -259,9 +849,7 @@ class LinuxAdapter(OSAdapter):
         with open(path,"w") as f: f.write(text)
         self.open_url(path)
     def notes_append(self, title:str, body:str)->None:
-        path = os.path.join(NOTES_DIR, f"{title}.md")
-        with open(path,"a") as f: f.write(f"\n\n---\n{time.ctime()}\n{body}\n")
-        self.open_url(path)
+        NOTE_WRITER.append(title, body, self.open_url)
     def mail_draft(self, to_addr:Optional[str], subject:str, body:str)->None:
         from urllib.parse import quote
         url = f"mailto:{to_addr or ''}?subject={quote(subject)}&body={quote(body)}"
@@ -284,7 +872,7 @@ class WindowsAdapter(OSAdapter):
         s = (user_name or "").strip().lower()
         alts = self.APP_ALTS.get(s) or [s]
         for c in alts:
-            if self._start(c): return True
+            if self._start(APP_CATALOG.which(c) or c): return True
         return False
     def open_url(self, url:str)->None: self._start(url)
     def simple_text_doc(self, text:str)->None:
@@ -292,9 +880,7 @@ class WindowsAdapter(OSAdapter):
         with open(path,"w",encoding="utf-8") as f: f.write(text)
         self.open_url(path)
     def notes_append(self, title:str, body:str)->None:
-        path = os.path.join(NOTES_DIR, f"{title}.md")
-        with open(path,"a",encoding="utf-8") as f: f.write(f"\n\n---\n{time.ctime()}\n{body}\n")
-        self.open_url(path)
+        NOTE_WRITER.append(title, body, self.open_url)
     def mail_draft(self, to_addr:Optional[str], subject:str, body:str)->None:
         from urllib.parse import quote
         url = f"mailto:{to_addr or ''}?subject={quote(subject)}&body={quote(body)}"
@@ -304,15 +890,339 @@ if "darwin" in SYS or "mac" in SYS: ADAPT: OSAdapter = MacAdapter()
 elif "windows" in SYS: ADAPT = WindowsAdapter()
 else: ADAPT = LinuxAdapter()
 
+# --------- reminder scheduler ----------
+REMINDERS_FILE = os.path.join(DATA_DIR, "reminders.jsonl")
+
+class ReminderScheduler:
+    """Pending reminders in a heap of due times, fired by one thread however many there are.
+
+    Every change is appended to a JSON-lines journal ({"op": "add"|"due"|"del", ...}) that
+    start() replays, so reminders survive restarts; whatever came due meanwhile fires right
+    away, marked missed. Cancelled and moved entries stay in the heap and are skipped when
+    they surface. The journal is rewritten once it is mostly history.
+    """
+    MISSED_S = 60.0   # fired this late = came due while NeuroOS was not running
+    def __init__(self, path: str, fire: Callable[[List[Dict[str, Any]]], None]):
+        self.path, self.fire = path, fire
+        self._items: Dict[int, Dict[str, Any]] = {}   # id -> {"id", "msg", "due", "every"}
+        self._heap: List[Tuple[float, int]] = []
+        self._fired: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()   # recently fired, for snooze
+        self._cv = threading.Condition()
+        self._next_id = 1; self._lines = 0; self._fh = None
+        self._thread: Optional[threading.Thread] = None
+
+    # ---- journal ----
+    def _log(self, rec: Dict[str, Any]) -> None:
+        try:
+            if self._fh is None:
+                Path(os.path.dirname(self.path)).mkdir(parents=True, exist_ok=True)
+                self._fh = open(self.path, "a", encoding="utf-8")
+            self._fh.write(json.dumps(rec) + "\n"); self._fh.flush(); self._lines += 1
+            if self._lines > 2 * len(self._items) + 64: self._compact()
+        except OSError as e:
+            dbg(f"reminder journal write failed: {e}")
+    def _compact(self) -> None:
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for it in self._items.values(): f.write(json.dumps(dict(it, op="add")) + "\n")
+        if self._fh: self._fh.close(); self._fh = None
+        os.replace(tmp, self.path); self._lines = len(self._items)
+    def load(self) -> None:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f: lines = f.readlines()
+        except OSError:
+            return
+        items: Dict[int, Dict[str, Any]] = {}
+        for line in lines:
+            try: rec = json.loads(line); rid = int(rec["id"])
+            except (ValueError, KeyError, TypeError): continue   # e.g. a line cut short by a crash
+            op = rec.get("op")
+            if op == "add": items[rid] = {"id": rid, "msg": str(rec.get("msg") or "Reminder"), "due": float(rec["due"]), "every": float(rec.get("every") or 0)}
+            elif op == "due" and rid in items: items[rid]["due"] = float(rec["due"])
+            elif op == "del": items.pop(rid, None)
+            self._next_id = max(self._next_id, rid + 1)
+        with self._cv:
+            self._items = items; self._heap = [(it["due"], rid) for rid, it in items.items()]; heapq.heapify(self._heap)
+            self._lines = len(lines); self._cv.notify()
+
+    # ---- commands ----
+    def start(self) -> None:
+        if self._thread: return
+        self.load()
+        self._thread = threading.Thread(target=self._run, name="reminders", daemon=True); self._thread.start()
+    def add(self, msg: str, due: float, every: float = 0.0) -> int:
+        with self._cv:
+            rid = self._next_id; self._next_id += 1
+            it = {"id": rid, "msg": msg, "due": due, "every": every}
+            self._items[rid] = it; heapq.heappush(self._heap, (due, rid))
+            self._log(dict(it, op="add")); self._cv.notify()
+            return rid
+    def cancel(self, rid: int) -> bool:
+        with self._cv:
+            if self._items.pop(rid, None) is None: return False
+            self._log({"op": "del", "id": rid}); self._cv.notify()
+            return True
+    def snooze(self, rid: Optional[int], seconds: float) -> Optional[Dict[str, Any]]:
+        """Fires reminder rid (None = the one that fired last) again in `seconds`: a reminder
+        that just went off comes back once, a pending one is moved. Returns it, or None."""
+        with self._cv:
+            if rid is None: rid = next(reversed(self._fired), None)
+            if rid is None: return None
+            it = self._items.get(rid); fired = self._fired.pop(rid, None)
+            if fired is not None and it is not None and it["every"]:   # the series goes on; repeat this one once
+                rid = self.add(fired["msg"], time.time() + seconds); return dict(self._items[rid])
+            if it is None:
+                if fired is None: return None
+                it = {"id": rid, "msg": fired["msg"], "due": 0.0, "every": 0.0}; self._items[rid] = it
+                self._log(dict(it, op="add"))
+            it["due"] = time.time() + seconds; heapq.heappush(self._heap, (it["due"], rid))
+            self._log({"op": "due", "id": rid, "due": it["due"]}); self._cv.notify()
+            return dict(it)
+    def pending(self) -> List[Dict[str, Any]]:
+        with self._cv: return sorted((dict(it) for it in self._items.values()), key=lambda it: it["due"])
+    def count(self) -> int:
+        with self._cv: return len(self._items)
+
+    # ---- firing ----
+    def _run(self) -> None:
+        while True:
+            with self._cv:
+                due: List[Dict[str, Any]] = []
+                while not due:
+                    now = time.time()
+                    while self._heap:
+                        t, rid = self._heap[0]; it = self._items.get(rid)
+                        if it is None or it["due"] != t: heapq.heappop(self._heap); continue   # cancelled or moved
+                        if t > now: break
+                        heapq.heappop(self._heap); due.append(dict(it, missed=now - t > self.MISSED_S))
+                        if it["every"] > 0:   # recurring: next slot after now, skipping the ones missed
+                            it["due"] = t + it["every"] * max(1, math.ceil((now - t) / it["every"]))
+                            heapq.heappush(self._heap, (it["due"], rid)); self._log({"op": "due", "id": rid, "due": it["due"]})
+                        else:
+                            del self._items[rid]; self._log({"op": "del", "id": rid})
+                        self._fired[rid] = due[-1]
+                        while len(self._fired) > 50: self._fired.popitem(last=False)
+                    if not due: self._cv.wait(self._heap[0][0] - now if self._heap else None)
+            for it in due: METRICS.inc("neuroos_reminders_fired_total", missed="true" if it["missed"] else "false")
+            try: self.fire(due)
+            except Exception as e: log_ex(e)
+
+# --------- note writer ----------
+NOTES_JOURNAL_DIR = os.path.join(DATA_DIR, "journal")
+
+class NoteWriter:
+    """Appends to <notes_dir>/<title>.md from one background thread, so "take note" returns at once.
+
+    Entries that arrive within batch_s of the first pending one are written together, one open
+    per note; written notes are fsynced at most every fsync_s (0 = after every batch). Each
+    entry also goes to a per-day journal (<journal_dir>/YYYY-MM-DD.jsonl) and to an index of
+    title -> (day, offset, length) (index.jsonl), so history() reads a note's entries with
+    seeks instead of scanning files. reopen: "always" shows the note after every batch,
+    "once" the first time it is written this session, "never" not at all. A note that cannot be
+    written stays queued and is retried with backoff; until a write and fsync succeed again,
+    flush() returns False and the next append() raises the error.
+    """
+    REOPEN = ("always", "once", "never")
+    RETRY_S = (1.0, 30.0)   # first and longest wait before retrying a failed write
+    def __init__(self, notes_dir: str, journal_dir: str, batch_s: float = 0.2, fsync_s: float = 1.0,
+                 reopen: str = "always", on_write: Optional[Callable[[List[str]], None]] = None):
+        self.notes_dir, self.journal_dir = notes_dir, journal_dir
+        self.batch_s, self.fsync_s, self.on_write = batch_s, fsync_s, on_write
+        self.reopen = reopen if reopen in self.REOPEN else "always"
+        self._pending: "OrderedDict[str, List[Tuple[float, str, Optional[Callable[[str], None]]]]]" = OrderedDict()
+        self._cv = threading.Condition()
+        self._first = 0.0; self._seq = self._synced = 0; self._sync_now = self._closing = False
+        self._error: Optional[Exception] = None; self._retry_at = 0.0; self._backoff = 0.0
+        self._thread: Optional[threading.Thread] = None
+        # writer thread only
+        self._unsynced: Dict[str, Any] = {}   # note path -> handle, fsynced and closed at the next sync
+        self._last_sync = 0.0; self._opened: set = set()
+        self._jday: Optional[str] = None; self._jfh = None; self._ifh = None
+        self._index: Optional[Dict[str, List[Tuple[str, int, int]]]] = None   # title.lower() -> refs, loaded on first use
+        self._ilock = threading.Lock()
+
+    def path(self, title: str) -> str:
+        return os.path.join(self.notes_dir, f"{title}.md")
+    def append(self, title: str, body: str, opener: Optional[Callable[[str], None]] = None) -> None:
+        """Queues one entry; opener(path) is called after it is written, as `reopen` allows.
+        Raises OSError when an earlier write failed (the entry is still queued and retried)."""
+        with self._cv:
+            if not self._pending: self._first = time.monotonic()
+            self._pending.setdefault(title, []).append((time.time(), body, opener)); self._seq += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="neuroos-notes", daemon=True); self._thread.start()
+            self._cv.notify()
+            err, self._error = self._error, None
+        if err is not None: raise OSError(f"notes are not being saved ({err}); retrying")
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Writes and fsyncs everything appended so far; False if a write or fsync failed or
+        that took longer than timeout."""
+        with self._cv:
+            seq = self._seq
+            if self._synced >= seq: return True
+            self._sync_now = True; self._retry_at = 0.0; self._error = None; self._cv.notify()   # a fresh attempt decides
+            return self._cv.wait_for(lambda: self._synced >= seq or self._error is not None, timeout) and self._synced >= seq
+    def close(self) -> None:
+        with self._cv: self._closing = True
+        if not self.flush(): print(f"[neuroos] Some notes could not be saved to {self.notes_dir}: {self._error or 'timed out'}")
+
+    # ---- writer ----
+    def _run(self) -> None:
+        while True:
+            with self._cv:
+                while True:
+                    now = time.monotonic(); waits = []
+                    if self._pending:
+                        ready = max(self._first + self.batch_s, self._retry_at)
+                        if now >= self._retry_at and (self._sync_now or self._closing or now >= ready): break
+                        waits.append(ready - now)
+                    if self._unsynced:
+                        if self._sync_now or now - self._last_sync >= self.fsync_s: break
+                        waits.append(self._last_sync + self.fsync_s - now)
+                    self._cv.wait(max(0.0, min(waits)) if waits else None)
+                batch, self._pending = self._pending, OrderedDict(); seq = self._seq
+                sync = self._sync_now or self._closing or time.monotonic() - self._last_sync >= self.fsync_s
+                self._sync_now = False
+            failed = self._write(batch) if batch else {}
+            err = next((e for e, _ in failed.values()), None)
+            if sync: err = self._sync() or err
+            with self._cv:
+                if failed:   # back to the front of the queue, tried again after a backoff
+                    rest, self._pending = self._pending, OrderedDict((t, list(e)) for t, (_, e) in failed.items())
+                    for title, entries in rest.items(): self._pending.setdefault(title, []).extend(entries)
+                    self._backoff = min(self.RETRY_S[1], self._backoff * 2 or self.RETRY_S[0])
+                    self._first = time.monotonic(); self._retry_at = self._first + self._backoff
+                elif err is None:
+                    self._backoff = 0.0; self._retry_at = 0.0
+                if err is not None: self._error = err
+                elif not self._unsynced and not failed: self._synced = seq; self._error = None
+                self._cv.notify_all()
+            batch = OrderedDict((t, e) for t, e in batch.items() if t not in failed)
+            if batch and self.on_write:
+                try: self.on_write(list(batch))
+                except Exception as e: log_ex(e)
+            for title, entries in batch.items():
+                opener, path = entries[-1][2], self.path(title)
+                if opener is None or self.reopen == "never" or (self.reopen == "once" and path in self._opened): continue
+                self._opened.add(path)
+                try: opener(path)
+                except Exception as e: dbg(f"note open failed: {e}")
+    def _write(self, batch: "OrderedDict[str, List[Tuple[float, str, Any]]]") -> Dict[str, Tuple[Exception, List[Any]]]:
+        """Appends each note's entries; returns the notes that could not be written (title -> (error, entries))."""
+        failed: Dict[str, Tuple[Exception, List[Any]]] = {}
+        for title, entries in batch.items():
+            path = self.path(title)
+            try:
+                Path(self.notes_dir).mkdir(parents=True, exist_ok=True)
+                fh = self._unsynced.get(path)
+                if fh is None: fh = self._unsynced[path] = open(path, "a", encoding="utf-8")
+                fh.write("".join(f"\n\n---\n{time.ctime(ts)}\n{body}\n" for ts, body, _ in entries)); fh.flush()
+            except (OSError, ValueError) as e:
+                dbg(f"note write failed for {path}: {e}"); failed[title] = (e, entries)
+                fh = self._unsynced.pop(path, None)
+                if fh:
+                    try: fh.close()
+                    except OSError: pass
+                continue
+            try:   # the note itself is saved; history() just misses what the journal could not take
+                for ts, body, _ in entries: self._journal(title, ts, body)
+            except OSError as e:
+                log_ex(e)
+        try:
+            if self._jfh: self._jfh.flush(); self._ifh.flush()
+        except OSError as e:
+            log_ex(e)
+        return failed
+    def _journal(self, title: str, ts: float, body: str) -> None:
+        day = time.strftime("%Y-%m-%d", time.localtime(ts))
+        if day != self._jday or self._jfh is None:
+            Path(self.journal_dir).mkdir(parents=True, exist_ok=True)
+            if self._jfh: self._jfh.close()
+            self._jfh = open(os.path.join(self.journal_dir, f"{day}.jsonl"), "ab"); self._jday = day
+            if self._ifh is None: self._ifh = open(os.path.join(self.journal_dir, "index.jsonl"), "a", encoding="utf-8")
+        line = (json.dumps({"ts": ts, "title": title, "body": body}) + "\n").encode("utf-8")
+        off = self._jfh.tell(); self._jfh.write(line)
+        self._ifh.write(json.dumps({"t": title, "d": day, "o": off, "n": len(line)}) + "\n")
+        with self._ilock:
+            if self._index is not None: self._index.setdefault(title.lower(), []).append((day, off, len(line)))
+    def _sync(self) -> Optional[Exception]:
+        """fsyncs and closes the written notes; returns the first error writing a note back."""
+        err: Optional[Exception] = None
+        for path, fh in list(self._unsynced.items()):
+            try: os.fsync(fh.fileno())
+            except OSError as e: dbg(f"note sync failed for {path}: {e}"); err = err or e
+            try: fh.close()
+            except OSError as e: err = err or e
+        self._unsynced.clear()
+        for fh in (self._jfh, self._ifh):
+            if fh:
+                try: os.fsync(fh.fileno())
+                except OSError as e: dbg(f"journal sync failed: {e}")
+        self._last_sync = time.monotonic()
+        return err
+
+    # ---- history ----
+    def _load_index(self) -> Dict[str, List[Tuple[str, int, int]]]:
+        with self._ilock:
+            if self._index is None:
+                idx: Dict[str, List[Tuple[str, int, int]]] = {}
+                try:
+                    with open(os.path.join(self.journal_dir, "index.jsonl"), "r", encoding="utf-8") as f:
+                        for line in f:
+                            try: r = json.loads(line); idx.setdefault(str(r["t"]).lower(), []).append((r["d"], int(r["o"]), int(r["n"])))
+                            except (ValueError, KeyError, TypeError): continue
+                except OSError:
+                    pass
+                self._index = idx
+            return self._index
+    def history(self, title: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """The last `limit` entries written to note `title` (any case), oldest first: [{"ts", "body"}]."""
+        self.flush()
+        idx = self._load_index()
+        with self._ilock: refs = list(idx.get(title.lower(), [])[-limit:])
+        out: List[Dict[str, Any]] = []; files: Dict[str, Any] = {}
+        try:
+            for day, off, n in refs:
+                fh = files.get(day)
+                if fh is None:
+                    try: fh = files[day] = open(os.path.join(self.journal_dir, f"{day}.jsonl"), "rb")
+                    except OSError: continue
+                fh.seek(off)
+                try: r = json.loads(fh.read(n))
+                except ValueError: continue   # another instance wrote here first
+                if str(r.get("title", "")).lower() == title.lower(): out.append({"ts": r["ts"], "body": r["body"]})
+        finally:
+            for fh in files.values(): fh.close()
+        return out
+
+NOTE_WRITER = NoteWriter(NOTES_DIR, NOTES_JOURNAL_DIR, batch_s=float(os.environ.get("NEUROOS_NOTES_BATCH_MS", "200")) / 1000,
+                         fsync_s=float(os.environ.get("NEUROOS_NOTES_FSYNC_S", "1")), reopen=os.environ.get("NEUROOS_NOTES_REOPEN", "always").lower(),
+                         on_write=lambda titles: NOTES.mark_dirty())
+
 # --------- Notes / reminders / mail wrappers ----------
 def notes_create_or_append(title: str, body: str):
     ADAPT.notes_append(title, body); notify("NeuroOS", f"Added to '{title}'"); speak("Added to notes.")
 
-_timers: List[threading.Timer] = []
-def _fire_local_reminder(msg:str):
-    notify("NeuroOS Reminder", msg); speak(msg)
+def _rel_seconds(rel: Tuple[str, int]) -> int:
+    unit, n = rel; n = int(n)
+    return n * 86400 if unit=="days" else n * 3600 if unit=="hours" else n * 60 if unit=="minutes" else n
+
+def _fire_reminders(items: List[Dict[str, Any]]):
+    for it in items:
+        late = " (missed at {})".format(time.strftime("%H:%M", time.localtime(it["due"]))) if it["missed"] else ""
+        print(f"\n[neuroos] Reminder #{it['id']}{late}: {it['msg']}")
+    if len(items) > 3:   # catching up after a restart: one notification, not dozens
+        notify("NeuroOS Reminder", "{} reminders: {}".format(len(items), "; ".join(it["msg"] for it in items[:3]) + " …"))
+        speak(f"{len(items)} reminders."); return
+    for it in items: notify("NeuroOS Reminder", it["msg"]); speak(it["msg"])
+
+REMINDERS = ReminderScheduler(REMINDERS_FILE, _fire_reminders)
 
-def reminders_add(message: str, at_hhmm: Optional[Tuple[int,int]] = None, delta_rel: Optional[Tuple[str,int]] = None):
+def _fmt_wait(sec: float) -> str:
+    return f"{int(sec)} sec" if sec < 60 else f"~{int(sec//60)} min" if sec < 7200 else f"~{sec/3600:.1f} h"
+
+def reminders_add(message: str, at_hhmm: Optional[Tuple[int,int]] = None, delta_rel: Optional[Tuple[str,int]] = None,
+                  every_rel: Optional[Tuple[str,int]] = None):
     when_sec = None
     if at_hhmm:
         h, m = at_hhmm
@@ -321,15 +1231,24 @@ def reminders_add(message: str, at_hhmm: Optional[Tuple[int,int]] = None, delta_
         if target <= time.time(): target += 86400
         when_sec = max(0, target - time.time())
     elif delta_rel:
-        unit, n = delta_rel; n = int(n)
-        when_sec = n * 3600 if unit=="hours" else n * 60 if unit=="minutes" else n
-    if when_sec is None:
+        when_sec = _rel_seconds(delta_rel)
+    every = _rel_seconds(every_rel) if every_rel else 0
+    if when_sec is None and not every:
         notify("NeuroOS Reminder", message); speak("Reminder added."); return
-    t = threading.Timer(when_sec, _fire_local_reminder, args=(message,))
-    t.daemon = True; t.start(); _timers.append(t)
-    print(f"[neuroos] Reminder in {int(when_sec)} sec: {message}" if when_sec<60 else f"[neuroos] Reminder in ~{int(when_sec//60)} min: {message}")
+    if when_sec is None: when_sec = every
+    rid = REMINDERS.add(message, time.time() + when_sec, every)
+    print(f"[neuroos] Reminder #{rid} in {_fmt_wait(when_sec)}{f', then every {_fmt_wait(every)}' if every else ''}: {message}")
     speak("Reminder set.")
 
+def reminders_list():
+    items = REMINDERS.pending()
+    if not items: print("[neuroos] No pending reminders."); return
+    now = time.time()
+    for it in items[:50]:
+        every = f" (every {_fmt_wait(it['every'])})" if it["every"] else ""
+        print("[neuroos] #{} {} (in {}){}: {}".format(it["id"], time.strftime("%a %H:%M", time.localtime(it["due"])), _fmt_wait(max(0, it["due"] - now)), every, it["msg"]))
+    if len(items) > 50: print(f"[neuroos] … and {len(items) - 50} more.")
+
 def mail_draft(to_addr: Optional[str], subject: str, body: str):
     ADAPT.mail_draft(to_addr, subject, body); speak("Draft ready.")
 
@@ -338,6 +1257,221 @@ def textedit_new_with(text:str): ADAPT.simple_text_doc(text)
 def music_play(): ADAPT.music_play()
 def music_pause(): ADAPT.music_pause()
 
+# --------- notes index ----------
+NOTES_INDEX_FILE = os.path.join(DATA_DIR, "notes_index.sqlite")
+NOTES_STOPWORDS = frozenset("a an and are as at be by did do does for from how i in is it me my of on or "
+                            "that the this to was were what when where which who why with you your".split())
+
+class NotesIndex:
+    """Search index over the .md/.txt files under NOTES_DIR, for grounding LLM answers.
+
+    Each note entry (the "---" separated blocks notes_append writes; long ones are cut at
+    paragraphs) is one snippet in a SQLite FTS5 table ranked by BM25. A refresh re-reads
+    only files whose mtime or size changed and runs in the background when a search finds
+    the index stale. With embed_model (a sentence-transformers model) snippets also get
+    normalized embeddings, appended to a memory-mapped float32 matrix, and the BM25 and
+    cosine rankings are fused (reciprocal rank).
+    """
+    SNIPPET_CHARS = 800
+    def __init__(self, path: str, root: str, embed_model: str = "", refresh_s: float = 30.0, enabled: bool = True):
+        self.path, self.root, self.embed_model, self.refresh_s, self.enabled = path, root, embed_model, refresh_s, enabled
+        self.vec_path = os.path.splitext(path)[0] + ".f32"
+        self._db = None; self._db_failed = False
+        self._lock = threading.Lock()         # the connection and the matrix
+        self._refreshing = threading.Lock()
+        self._stale_at = 0.0                  # refresh when time passes this (0 = now)
+        self._embedder = None; self._embed_failed = False; self._vecs = None; self._dim = 0
+        self.n_files = self.n_snippets = 0; self.last_ms = 0.0
+
+    # ---- storage ----
+    def _conn(self):
+        if self._db is None and not self._db_failed:
+            with self._lock:   # the first search and its background refresh both get here
+                if self._db is None and not self._db_failed: self._open_db()
+        return self._db
+    def _open_db(self) -> None:
+        try:
+            import sqlite3
+            Path(os.path.dirname(self.path)).mkdir(parents=True, exist_ok=True)
+            db = sqlite3.connect(self.path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL"); db.execute("PRAGMA synchronous=NORMAL")
+            db.execute("CREATE TABLE IF NOT EXISTS files (path TEXT PRIMARY KEY, mtime REAL, size INTEGER)")
+            db.execute("CREATE TABLE IF NOT EXISTS owners (id INTEGER PRIMARY KEY, path TEXT, vec INTEGER)")
+            db.execute("CREATE INDEX IF NOT EXISTS owners_path ON owners(path)")
+            db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS snips USING fts5(title, body, tokenize='porter unicode61')")
+            db.execute("CREATE TABLE IF NOT EXISTS meta (k TEXT PRIMARY KEY, v TEXT)")
+            row = db.execute("SELECT v FROM meta WHERE k='embed'").fetchone()
+            if (row[0] if row else "") != self.embed_model:   # other (or no) embedding model: vectors are void
+                db.execute("UPDATE owners SET vec=NULL")
+                db.execute("INSERT OR REPLACE INTO meta VALUES ('embed', ?)", (self.embed_model,))
+                if os.path.exists(self.vec_path): os.remove(self.vec_path)
+            row = db.execute("SELECT v FROM meta WHERE k='dim'").fetchone(); self._dim = int(row[0]) if row else 0
+            db.commit(); self._db = db
+            self.n_files = db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+            self.n_snippets = db.execute("SELECT COUNT(*) FROM owners").fetchone()[0]
+        except Exception as e:
+            self._db_failed = True; dbg("notes index disabled ({})".format(e))
+    def _snippets(self, text: str) -> List[str]:
+        out: List[str] = []
+        for block in re.split(r"\n-{3,}\n", text):
+            block = block.strip()
+            if len(block) <= self.SNIPPET_CHARS:
+                if block: out.append(block)
+                continue
+            cur = ""
+            for para in re.split(r"\n\s*\n", block):
+                while len(para) > self.SNIPPET_CHARS:
+                    if cur: out.append(cur); cur = ""
+                    out.append(para[:self.SNIPPET_CHARS]); para = para[self.SNIPPET_CHARS:]
+                if cur and len(cur) + len(para) + 2 > self.SNIPPET_CHARS: out.append(cur); cur = ""
+                cur = f"{cur}\n\n{para}" if cur else para
+            if cur.strip(): out.append(cur)
+        return out
+    def _drop(self, db, path: str) -> None:
+        db.execute("DELETE FROM snips WHERE rowid IN (SELECT id FROM owners WHERE path=?)", (path,))
+        db.execute("DELETE FROM owners WHERE path=?", (path,)); db.execute("DELETE FROM files WHERE path=?", (path,))
+
+    # ---- refresh ----
+    def mark_dirty(self) -> None:
+        self._stale_at = 0.0
+    def start(self) -> None:
+        """Brings the index up to date in the background."""
+        if self.enabled: self._refresh_bg(block=False)
+    def _refresh_bg(self, block: bool) -> None:
+        if not self._refreshing.acquire(blocking=block): return
+        def run():
+            try: self.refresh()
+            except Exception as e: log_ex(e)
+            finally: self._refreshing.release()
+        threading.Thread(target=run, name="notes-index", daemon=True).start()
+    def refresh(self) -> int:
+        """Re-indexes files whose mtime or size changed and drops vanished ones; returns how many."""
+        self._stale_at = time.time() + self.refresh_s
+        db = self._conn()
+        if db is None: return 0
+        seen: Dict[str, Tuple[float, int]] = {}
+        for d, _, names in os.walk(self.root):
+            for n in names:
+                if not n.endswith((".md", ".txt")): continue
+                p = os.path.join(d, n)
+                try: st = os.stat(p)
+                except OSError: continue
+                seen[p] = (st.st_mtime, st.st_size)
+        with self._lock: known = {p: (m, sz) for p, m, sz in db.execute("SELECT path, mtime, size FROM files")}
+        changed = [p for p, ms in seen.items() if known.get(p) != ms]; gone = [p for p in known if p not in seen]
+        for p in gone:
+            with self._lock: self._drop(db, p)
+        for p in changed:
+            try:
+                with open(p, "r", encoding="utf-8", errors="ignore") as f: text = f.read()
+            except OSError:
+                continue
+            title = os.path.splitext(os.path.relpath(p, self.root))[0]
+            with self._lock:
+                self._drop(db, p)
+                for body in self._snippets(text):
+                    rowid = db.execute("INSERT INTO owners(path) VALUES (?)", (p,)).lastrowid
+                    db.execute("INSERT INTO snips(rowid, title, body) VALUES (?,?,?)", (rowid, title, body))
+                db.execute("INSERT INTO files VALUES (?,?,?)", (p,) + seen[p])
+        with self._lock:
+            db.commit()
+            self.n_files = len(seen); self.n_snippets = db.execute("SELECT COUNT(*) FROM owners").fetchone()[0]
+        if self.embed_model: self._embed_missing(db)
+        dbg(f"notes index: {len(seen)} files, {len(changed)} re-read, {len(gone)} dropped")
+        return len(changed) + len(gone)
+
+    # ---- embeddings (optional) ----
+    def _embed(self, texts: List[str]):
+        import numpy as np
+        if self._embedder is None and not self._embed_failed:
+            try:
+                from sentence_transformers import SentenceTransformer
+                self._embedder = SentenceTransformer(self.embed_model, device="cpu")
+            except Exception as e:
+                self._embed_failed = True; dbg("notes embeddings unavailable ({}); BM25 only".format(e))
+        if self._embedder is None: return None
+        return np.asarray(self._embedder.encode(texts, batch_size=32, normalize_embeddings=True), dtype=np.float32)
+    def _matrix(self):
+        import numpy as np
+        if self._vecs is None and self._dim and os.path.exists(self.vec_path) and os.path.getsize(self.vec_path):
+            self._vecs = np.memmap(self.vec_path, dtype=np.float32, mode="r").reshape(-1, self._dim)
+        return self._vecs
+    def _embed_missing(self, db) -> None:
+        with self._lock: rows = db.execute("SELECT o.id, s.body FROM owners o JOIN snips s ON s.rowid=o.id WHERE o.vec IS NULL").fetchall()
+        for i in range(0, len(rows), 256):
+            batch = rows[i:i + 256]; vecs = self._embed([b for _, b in batch])
+            if vecs is None: return
+            with self._lock:
+                if not self._dim:
+                    self._dim = vecs.shape[1]; db.execute("INSERT OR REPLACE INTO meta VALUES ('dim', ?)", (str(self._dim),))
+                start = os.path.getsize(self.vec_path) // (4 * self._dim) if os.path.exists(self.vec_path) else 0
+                with open(self.vec_path, "ab") as f: f.write(vecs.tobytes())
+                db.executemany("UPDATE owners SET vec=? WHERE id=?", [(start + j, rid) for j, (rid, _) in enumerate(batch)])
+                db.commit(); self._vecs = None
+        self._compact(db)
+    def _compact(self, db) -> None:
+        """Rewrites the matrix without the rows of re-read or dropped snippets once they are the majority."""
+        import numpy as np
+        with self._lock:
+            m = self._matrix()
+            live = db.execute("SELECT id, vec FROM owners WHERE vec IS NOT NULL ORDER BY vec").fetchall()
+            if m is None or len(live) * 2 >= len(m): return
+            tmp = self.vec_path + ".tmp"
+            m[[v for _, v in live]].tofile(tmp)
+            self._vecs = None; os.replace(tmp, self.vec_path)
+            db.executemany("UPDATE owners SET vec=? WHERE id=?", [(j, rid) for j, (rid, _) in enumerate(live)]); db.commit()
+
+    # ---- search ----
+    def search(self, query: str, k: int = 3) -> List[Tuple[str, str]]:
+        """(title, snippet) of the k best matches; never waits for a refresh."""
+        terms = [t for t in re.findall(r"\w+", query.lower()) if len(t) > 1 and t not in NOTES_STOPWORDS]
+        if not self.enabled or not terms: return []
+        if time.time() >= self._stale_at: self._refresh_bg(block=False)
+        db = self._conn()
+        if db is None: return []
+        t0 = time.perf_counter(); pool = k * 4 if self.embed_model else k
+        with self._lock:
+            try:
+                rows = db.execute("SELECT rowid, title, body FROM snips WHERE snips MATCH ? ORDER BY bm25(snips, 2.0, 1.0) LIMIT ?",
+                                  (" OR ".join('"{}"'.format(t) for t in terms), pool)).fetchall()
+            except Exception as e:
+                dbg("notes search failed: {}".format(e)); rows = []
+        hits = {r[0]: (r[1], r[2]) for r in rows}; score = {r[0]: 1.0 / (60 + i) for i, r in enumerate(rows)}
+        for i, rid in enumerate(self._vector_ids(db, query, pool) if self.embed_model else ()):
+            score[rid] = score.get(rid, 0.0) + 1.0 / (60 + i)
+        best = sorted(score, key=score.get, reverse=True)[:k]
+        missing = [rid for rid in best if rid not in hits]
+        if missing:
+            with self._lock:
+                hits.update((r[0], (r[1], r[2])) for r in db.execute(
+                    "SELECT rowid, title, body FROM snips WHERE rowid IN ({})".format(",".join("?" * len(missing))), missing))
+        self.last_ms = (time.perf_counter() - t0) * 1000
+        return [hits[rid] for rid in best if rid in hits]
+    def _vector_ids(self, db, query: str, n: int) -> List[int]:
+        import numpy as np
+        q = self._embed([query])
+        with self._lock:
+            m = self._matrix()
+            if q is None or m is None or not len(m): return []
+            sims = m @ q[0]; top = np.argpartition(-sims, min(n, len(sims) - 1))[:n]
+            rows = [int(r) for r in top[np.argsort(-sims[top])]]
+            owner = dict(db.execute("SELECT vec, id FROM owners WHERE vec IN ({})".format(",".join("?" * len(rows))), rows).fetchall())
+        return [owner[r] for r in rows if r in owner]   # rows of replaced snippets have no owner
+    def context(self, query: str, k: int = 3, max_chars: int = 1500) -> str:
+        """The best snippets as an LLM context block ("" when nothing matches)."""
+        out: List[str] = []; left = max_chars
+        for title, body in self.search(query, k):
+            block = f"[{title}] {body}"[:left]; out.append(block); left -= len(block) + 2
+            if left <= 0: break
+        return "\n\n".join(out)
+    def stats(self) -> str:
+        if not self.enabled: return "notes off"
+        return "notes {} snippets in {} files{}, last search {:.1f} ms".format(
+            self.n_snippets, self.n_files, " (+embeddings)" if self.embed_model and not self._embed_failed else "", self.last_ms)
+
+NOTES = NotesIndex(NOTES_INDEX_FILE, NOTES_DIR, embed_model=os.environ.get("NEUROOS_NOTES_EMBED", ""),
+                   refresh_s=float(os.environ.get("NEUROOS_NOTES_REFRESH_S", "30")), enabled=os.environ.get("NEUROOS_NOTES_RAG", "1") == "1")
+
 # --------- app name resolution ----------
 APP_CANONICALS = {
     "safari":"safari","chrome":"chrome","google chrome":"chrome","edge":"edge",
@@ -350,13 +1484,15 @@ APP_SYNONYMS = {
     "v s code":"vscode", "visual studio code":"vscode", "visualstudio code":"vscode",
     "visualstudio":"vscode", "finder":"terminal" if not ("darwin" in SYS or "mac" in SYS) else "finder",
 }
+APP_NAMES.add("phrases", list(APP_SYNONYMS.keys()) + list(APP_CANONICALS.keys()))
+APP_NAMES.add("adapter", getattr(ADAPT, "APP_ALTS", None) or getattr(ADAPT, "APP_CANONICALS", None) or {})
+@traced("resolve_app_name")
 def resolve_app_name(user_name: str) -> Optional[str]:
     s = (user_name or "").strip().lower()
     if s in APP_SYNONYMS: s = APP_SYNONYMS[s]
     if s in APP_CANONICALS: return APP_CANONICALS[s]
-    candidates = list(APP_SYNONYMS.keys()) + list(APP_CANONICALS.keys())
-    best = difflib.get_close_matches(s, candidates, n=1, cutoff=0.72)
-    return APP_CANONICALS.get(best[0], best[0]) if best else s
+    best = APP_NAMES.close_match(s, "phrases", 0.72) or APP_NAMES.close_match(s, "adapter", 0.72)
+    return APP_CANONICALS.get(best, best) if best else s
 def open_app(user_name: str) -> bool:
     canonical = resolve_app_name(user_name)
     ok = ADAPT.open_app(canonical)
@@ -399,6 +1535,148 @@ def extract_message_after_at(text: str) -> Optional[str]:
     m = re.search(r"\bat\b.*?(?:to|for)\s+(.+)$", text, re.I)
     return m.group(1).strip() if m else None
 
+# --------- model residency ----------
+def _rss_mb() -> float:
+    """Resident set size of this process in MB (0 when it cannot be read)."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / 2**20
+    except Exception:
+        pass
+    try:
+        with open("/proc/self/statm") as f: return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except Exception:
+        return 0.0
+
+def _budget_mb(value: str) -> float:
+    """NEUROOS_MODEL_BUDGET_MB: a number of MB (0 = no limit) or "auto", half of physical
+    memory (2048 MB when that cannot be read)."""
+    if value.strip().lower() != "auto": return float(value)
+    try:
+        import psutil
+        return psutil.virtual_memory().total / 2**20 / 2
+    except Exception:
+        pass
+    try:
+        return os.sysconf("SC_PHYS_PAGES") * os.sysconf("SC_PAGE_SIZE") / 2**20 / 2
+    except Exception:
+        return 2048.0
+
+class ResidentModel:
+    def __init__(self, name: str, loader: Callable[[], Any], est_mb: float):
+        self.name, self.loader, self.mb = name, loader, est_mb   # mb: estimate until measured at load
+        self.obj: Any = None
+        self.state = "cold"   # cold | loading | ready | unloaded | error
+        self.err: Optional[str] = None
+        self.pins = 0; self.last_used = 0.0; self.since = time.time(); self.load_s = 0.0
+        self.done = threading.Event()
+
+class ModelResidency:
+    """Owns the heavy models (Whisper, the LLM): loads them in background threads, one at a
+    time; unloads them after ttl_s idle; keeps the resident total under budget_mb by
+    unloading the least recently used unpinned model before another one loads. A failed
+    load is tried again on use once RETRY_S has passed (or at once with retry=True)."""
+    RETRY_S = 30.0
+    def __init__(self, ttl_s: float, budget_mb: float):
+        self.ttl_s, self.budget_mb = ttl_s, budget_mb
+        self._models: Dict[str, ResidentModel] = {}
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()   # one load at a time: honest RSS deltas, and a CPU left for the REPL
+        self._reaper: Optional[threading.Thread] = None
+    def register(self, name: str, loader: Callable[[], Any], est_mb: float = 0.0) -> None:
+        self._models[name] = ResidentModel(name, loader, est_mb)
+    def start(self, names: List[str]) -> None:
+        """Preloads names in order, as far as their estimated sizes fit the budget together
+        (the rest load on first use, rather than evicting what was just preloaded)."""
+        total = 0.0
+        for n in names:
+            if n not in self._models: dbg("preload: unknown model {!r}".format(n)); continue
+            total += self._models[n].mb
+            if self.budget_mb > 0 and total > self.budget_mb:
+                dbg("preload: {} skipped, ~{:.0f} MB of models is over the {:.0f} MB budget".format(n, total, self.budget_mb))
+                total -= self._models[n].mb; continue
+            self.preload(n)
+        if self.ttl_s > 0 and self._reaper is None:
+            self._reaper = threading.Thread(target=self._reap, daemon=True); self._reaper.start()
+    def state(self, name: str) -> str:
+        return self._models[name].state
+    def error(self, name: str) -> Optional[str]:
+        return self._models[name].err
+    def preload(self, name: str, retry: bool = False) -> None:
+        m = self._models[name]
+        with self._lock:
+            if m.state in ("loading", "ready"): return
+            if m.state == "error" and not retry and time.time() - m.since < self.RETRY_S: return
+            m.state = "loading"; m.since = time.time(); m.done.clear()   # m.err stays for status until a load succeeds
+        threading.Thread(target=self._load, args=(m,), daemon=True).start()
+    def get(self, name: str, wait: bool = True, retry: bool = False) -> Any:
+        """The loaded model (loading it if needed); None on load error or if not wait and not ready.
+        retry=True retries a failed load right away (an explicit request, like `voice start`)."""
+        m = self._models[name]
+        self.preload(name, retry)
+        if wait: m.done.wait()
+        with self._lock:
+            if m.state != "ready": return None
+            m.last_used = time.time(); return m.obj
+    def pin(self, name: str) -> None:
+        with self._lock: self._models[name].pins += 1
+    def unpin(self, name: str) -> None:
+        with self._lock:
+            m = self._models[name]; m.pins = max(0, m.pins - 1); m.last_used = time.time()
+    def _load(self, m: ResidentModel) -> None:
+        with self._load_lock:
+            self._make_room(m)
+            before = _rss_mb(); t0 = time.time()
+            try:
+                obj = m.loader()
+            except Exception as e:
+                with self._lock: m.state = "error"; m.err = "{}: {}".format(e.__class__.__name__, e); m.since = time.time()
+                dbg("{} failed to load: {}".format(m.name, m.err))   # surfaced by status and on use
+            else:
+                grown = _rss_mb() - before
+                with self._lock:
+                    m.obj = obj; m.state = "ready"; m.err = None; m.load_s = time.time() - t0
+                    m.since = m.last_used = time.time()
+                    if grown > 0: m.mb = grown
+                dbg("{} loaded in {:.1f}s (~{:.0f} MB)".format(m.name, m.load_s, m.mb))
+            finally:
+                m.done.set()
+    def _make_room(self, m: ResidentModel) -> None:
+        if self.budget_mb <= 0: return
+        with self._lock:
+            others = sorted((x for x in self._models.values() if x is not m and x.state == "ready"), key=lambda x: x.last_used)
+            total = m.mb + sum(x.mb for x in others)
+            for x in others:
+                if total <= self.budget_mb: break
+                if not x.pins and self.unload(x.name, "memory budget"): total -= x.mb
+        if total > self.budget_mb:
+            dbg("loading {} puts models at ~{:.0f} MB, over the {:.0f} MB budget".format(m.name, total, self.budget_mb))
+    def unload(self, name: str, why: str = "") -> bool:
+        with self._lock:
+            m = self._models[name]
+            if m.state != "ready" or m.pins: return False
+            m.obj = None; m.state = "unloaded"; m.since = time.time()
+        import gc; gc.collect()
+        dbg("{} unloaded ({})".format(name, why or "requested")); return True
+    def _reap(self) -> None:
+        while True:
+            time.sleep(max(5.0, min(60.0, self.ttl_s / 4)))
+            now = time.time()
+            for m in list(self._models.values()):
+                if m.state == "ready" and not m.pins and now - m.last_used > self.ttl_s:
+                    self.unload(m.name, "idle {:.0f}s".format(now - m.last_used))
+    def describe(self, name: str) -> str:
+        m = self._models[name]; now = time.time()
+        if m.state == "ready":
+            use = "in use" if m.pins else "idle {:.0f}s".format(now - m.last_used)
+            return "resident ~{:.0f}MB, loaded in {:.1f}s, {}".format(m.mb, m.load_s, use)
+        if m.state == "loading": return "loading in background ({:.0f}s)".format(now - m.since)
+        if m.state == "unloaded": return "unloaded {:.0f}s ago to free memory; reloads on use".format(now - m.since)
+        if m.state == "error": return "load failed {:.0f}s ago: {}; tried again on use".format(now - m.since, m.err)
+        return "not loaded"
+
+MODELS = ModelResidency(float(os.environ.get("NEUROOS_MODEL_TTL_S", "1800")), _budget_mb(os.environ.get("NEUROOS_MODEL_BUDGET_MB", "auto")))
+
 # --------- tiny rule-answers + LLM ----------
 CAPITALS = {"india":"New Delhi","usa":"Washington, D.C.","united states":"Washington, D.C.","uk":"London",
             "united kingdom":"London","france":"Paris","germany":"Berlin","italy":"Rome","spain":"Madrid",
@@ -412,52 +1690,572 @@ def qa_rule_answer(q: str) -> Optional[str]:
                 "Threads must acquire it before touching shared state and release it after, preventing race conditions.")
     return None
 
-class LLMEngine:
-    def __init__(self):
-        self._ready=False; self._err=None; self._pipe=None; self._task=None; self._is_encdec=False
-        self._model_id = os.environ.get("NEUROOS_HF_PATH") or os.environ.get("NEUROOS_HF_MODEL","Qwen/Qwen2.5-0.5B-Instruct")
+LLM_CACHE_FILE = os.path.join(DATA_DIR, "llm_cache.sqlite")
+
+class AnswerCache:
+    """Generated answers by key: an in-memory LRU in front of a SQLite table. Entries expire
+    after ttl_s; the table is trimmed to max_rows, least recently used first."""
+    def __init__(self, path: str, mem_size: int = 256, ttl_s: float = 7 * 86400, max_rows: int = 2000, enabled: bool = True):
+        self.path, self.mem_size, self.ttl_s, self.max_rows, self.enabled = path, mem_size, ttl_s, max_rows, enabled
+        self._mem: "OrderedDict[str, Tuple[str, float, float]]" = OrderedDict()   # key -> (answer, gen_s, created)
+        self._db = None; self._db_failed = False; self._puts = 0
         self._lock = threading.Lock()
-    def _lazy_load(self):
+        self.hits_mem = self.hits_disk = self.misses = 0; self.saved_s = 0.0
+    @staticmethod
+    def key(model_id: str, prompt: str, params: Dict[str, Any]) -> str:
+        import hashlib
+        return hashlib.sha256(json.dumps([model_id, prompt, params], sort_keys=True).encode("utf-8")).hexdigest()
+    def _conn(self):
+        if self._db is None and not self._db_failed:
+            try:
+                import sqlite3
+                Path(os.path.dirname(self.path)).mkdir(parents=True, exist_ok=True)
+                self._db = sqlite3.connect(self.path, check_same_thread=False)
+                self._db.execute("PRAGMA journal_mode=WAL"); self._db.execute("PRAGMA synchronous=NORMAL")   # no fsync per answer
+                self._db.execute("CREATE TABLE IF NOT EXISTS answers (key TEXT PRIMARY KEY, answer TEXT, gen_s REAL, created REAL, used REAL)")
+                self._db.commit()
+            except Exception as e:
+                self._db_failed = True; dbg("answer cache: disk tier disabled ({})".format(e))
+        return self._db
+    def _remember(self, key: str, entry: Tuple[str, float, float]) -> None:
+        self._mem[key] = entry; self._mem.move_to_end(key)
+        while len(self._mem) > self.mem_size: self._mem.popitem(last=False)
+    def get(self, key: str, count: bool = True) -> Optional[str]:
+        """Cached answer or None; count=False leaves a miss out of the stats."""
+        if not self.enabled: return None
+        now = time.time()
         with self._lock:
-            if self._ready or self._err: return
+            e = self._mem.get(key)
+            if e and now - e[2] <= self.ttl_s:
+                self._mem.move_to_end(key); self.hits_mem += 1; self.saved_s += e[1]; return e[0]
+            if e: del self._mem[key]
+            db = self._conn()
+            if db is not None:
+                try:
+                    row = db.execute("SELECT answer, gen_s, created FROM answers WHERE key=?", (key,)).fetchone()
+                    if row and now - row[2] <= self.ttl_s:
+                        db.execute("UPDATE answers SET used=? WHERE key=?", (now, key)); db.commit()
+                        self._remember(key, tuple(row)); self.hits_disk += 1; self.saved_s += row[1]; return row[0]
+                except Exception as e:
+                    dbg("answer cache read failed: {}".format(e))
+            if count: self.misses += 1
+            return None
+    def put(self, key: str, answer: str, gen_s: float) -> None:
+        if not self.enabled: return
+        now = time.time()
+        with self._lock:
+            self._remember(key, (answer, gen_s, now))
+            db = self._conn()
+            if db is None: return
+            try:
+                db.execute("INSERT OR REPLACE INTO answers VALUES (?,?,?,?,?)", (key, answer, gen_s, now, now))
+                if self._puts % 50 == 0:   # expire and trim now and then, not on every write
+                    db.execute("DELETE FROM answers WHERE created < ?", (now - self.ttl_s,))
+                    db.execute("DELETE FROM answers WHERE key IN (SELECT key FROM answers ORDER BY used DESC LIMIT -1 OFFSET ?)", (self.max_rows,))
+                db.commit(); self._puts += 1
+            except Exception as e:
+                dbg("answer cache write failed: {}".format(e))
+    def stats(self) -> str:
+        if not self.enabled: return "cache off"
+        hits = self.hits_mem + self.hits_disk; total = hits + self.misses
+        return "cache {}/{} hits ({:.0f}%, {} from memory), saved {:.1f}s of generation".format(
+            hits, total, 100.0 * hits / total if total else 0.0, self.hits_mem, self.saved_s)
+
+ANSWERS = AnswerCache(LLM_CACHE_FILE, ttl_s=float(os.environ.get("NEUROOS_LLM_CACHE_TTL_S", str(7 * 86400))),
+                      max_rows=int(os.environ.get("NEUROOS_LLM_CACHE_MAX", "2000")), enabled=os.environ.get("NEUROOS_LLM_CACHE", "1") == "1")
+
+# --------- LLM backends ----------
+class GenProbe:
+    """Shared by LLMEngine and a backend during one streamed generation: the backend records
+    the first-token time and token count, and stops once `stop` is set or stop_text appears."""
+    def __init__(self, stop_text: str = "\nQ:"):
+        self.stop_text = stop_text; self.stop = False
+        self.t_first: Optional[float] = None; self.n = 0
+        self.reused = 0   # prompt tokens whose KV state came from the prefix cache
+
+class LlmBackend:
+    """Inference backend behind LLMEngine. Generation params are transformers-style
+    (max_new_tokens, num_beams, do_sample, return_full_text); generate() answers several
+    prompts in one call, stream() yields the text of one answer as it is produced."""
+    kind = "base"
+    def __init__(self, model_id: str):
+        self.model_id = model_id; self.tokenizer = None
+        self.is_encdec = False; self.task = "text-generation"
+    def _config(self) -> None:
+        from transformers import AutoConfig
+        cfg = AutoConfig.from_pretrained(self.model_id, trust_remote_code=True)
+        self.is_encdec = bool(getattr(cfg, "is_encoder_decoder", False))
+        self.task = "text2text-generation" if self.is_encdec else "text-generation"
+    def load(self) -> "LlmBackend":
+        raise NotImplementedError
+    def generate(self, prompts: List[str], params: Dict[str, Any]) -> List[str]:
+        raise NotImplementedError
+    def stream(self, prompt: str, params: Dict[str, Any], probe: GenProbe, prefix: str = "") -> Iterator[str]:
+        """prefix: leading part of prompt that recurs across calls (preamble, selection context);
+        backends that can keep its encoded state reuse it instead of prefilling it again."""
+        text = self.generate([prompt], params)[0]   # backends that cannot stream answer in one piece
+        probe.t_first = time.time(); probe.n = self.count_tokens(text)
+        if text: yield text
+    def count_tokens(self, text: str) -> int:
+        return len(self.tokenizer(text)["input_ids"]) if text else 0
+
+class HfBackend(LlmBackend):
+    """transformers pipeline in full precision. Streamed decoder-only answers keep the KV
+    cache of recent prompt prefixes and only prefill the rest of the prompt."""
+    kind = "hf"
+    def __init__(self, model_id: str):
+        super().__init__(model_id)
+        self.prefix_max = int(os.environ.get("NEUROOS_LLM_PREFIX_CACHE", "4"))
+        self._prefixes: "OrderedDict[str, Tuple[List[int], Any]]" = OrderedDict()   # prefix -> (token ids, KV cache)
+    def load(self) -> "LlmBackend":
+        from transformers import pipeline
+        self._config()
+        self.pipe = pipeline(self.task, model=self.model_id, device_map="cpu", trust_remote_code=True)
+        self.tokenizer = self.pipe.tokenizer
+        return self
+    def _prefill(self, prefix: str) -> Tuple[List[int], Any]:
+        hit = self._prefixes.get(prefix)
+        if hit is not None: self._prefixes.move_to_end(prefix); return hit
+        import torch
+        ids = self.tokenizer(prefix, return_tensors="pt")["input_ids"]
+        with torch.no_grad(): out = self.pipe.model(input_ids=ids, use_cache=True)
+        self._prefixes[prefix] = hit = (ids[0].tolist(), out.past_key_values)
+        while len(self._prefixes) > self.prefix_max: self._prefixes.popitem(last=False)
+        return hit
+    def _prefix_kv(self, prefix: str, ids: List[int]) -> Tuple[Any, int]:
+        """A private copy of the prefix KV cache cut to the k tokens it shares with ids (at
+        least one prompt token is left to prefill) and k, counted only when the prefix was
+        already cached; (None, 0) when there is none."""
+        if not prefix or self.prefix_max <= 0: return None, 0
+        cached = prefix in self._prefixes
+        pre_ids, kv = self._prefill(prefix)
+        k = 0
+        for a, b in zip(pre_ids, ids[:-1]):
+            if a != b: break
+            k += 1
+        if k == 0 or (k < len(pre_ids) and not hasattr(kv, "crop")): return None, 0
+        import copy
+        kv = copy.deepcopy(kv)
+        if k < len(pre_ids): kv.crop(k)
+        return kv, k if cached else 0
+    def generate(self, prompts: List[str], params: Dict[str, Any]) -> List[str]:
+        if len(prompts) > 1 and not self.is_encdec:   # decoder-only batches are left-padded
+            self.tokenizer.padding_side = "left"
+            if self.tokenizer.pad_token is None: self.tokenizer.pad_token = self.tokenizer.eos_token
+        res = self.pipe(prompts, batch_size=len(prompts), **params)
+        return [((r[0] if isinstance(r, list) else r).get("generated_text") or "") for r in res]
+    def stream(self, prompt: str, params: Dict[str, Any], probe: GenProbe, prefix: str = "") -> Iterator[str]:
+        """Runs generation in a thread behind a TextIteratorStreamer, with a stopping
+        criterion on the probe. Beam search (encoder-decoder models) cannot stream."""
+        try:
+            import torch
+            from transformers import TextIteratorStreamer, StoppingCriteria, StoppingCriteriaList
+        except Exception:
+            TextIteratorStreamer = None
+        if self.is_encdec or TextIteratorStreamer is None:
+            yield from super().stream(prompt, params, probe); return
+        tok = self.tokenizer
+        class Probe(StoppingCriteria):
+            start = None
+            def __call__(self, input_ids, scores, **kw):
+                if self.start is None: self.start = input_ids.shape[1] - 1; probe.t_first = time.time()
+                probe.n = input_ids.shape[1] - self.start
+                done = probe.stop or probe.stop_text in tok.decode(input_ids[0, self.start:][-8:], skip_special_tokens=True)
+                return torch.full((input_ids.shape[0],), done, dtype=torch.bool, device=input_ids.device)
+        streamer = TextIteratorStreamer(tok, skip_prompt=True, skip_special_tokens=True)
+        enc = tok(prompt, return_tensors="pt")
+        try: kv, probe.reused = self._prefix_kv(prefix, enc["input_ids"][0].tolist())
+        except Exception as e:
+            dbg("prefix cache unavailable ({}); prefilling the whole prompt".format(e)); kv = None
+        def run():
             try:
-                from transformers import AutoConfig, pipeline
-                cfg = AutoConfig.from_pretrained(self._model_id, trust_remote_code=True)
-                self._is_encdec = bool(getattr(cfg,"is_encoder_decoder",False))
-                self._task = "text2text-generation" if self._is_encdec else "text-generation"
-                self._pipe = pipeline(self._task, model=self._model_id, device_map="cpu", trust_remote_code=True)
-                self._ready=True; dbg(f"LLM loaded: {self._model_id} encdec={self._is_encdec}")
+                if kv is None: self.pipe(prompt, streamer=streamer, stopping_criteria=StoppingCriteriaList([Probe()]), **params)
+                else:
+                    kw = {k: v for k, v in params.items() if k != "return_full_text"}
+                    self.pipe.model.generate(**enc, past_key_values=kv, streamer=streamer, stopping_criteria=StoppingCriteriaList([Probe()]),
+                                             pad_token_id=tok.pad_token_id if tok.pad_token_id is not None else tok.eos_token_id, **kw)
             except Exception as e:
-                self._err=str(e); log_ex(e)
+                log_ex(e); streamer.end()
+        th = threading.Thread(target=run, daemon=True); th.start()
+        try:
+            yield from streamer
+        finally:
+            probe.stop = True   # also when the reader gave up early
+            th.join()
+
+class Int8Backend(HfBackend):
+    """transformers pipeline with the Linear layers dynamically quantized to int8 (weights
+    int8, activations quantized per batch): about a quarter of the weight memory, faster matmuls."""
+    kind = "int8"
+    def load(self) -> "LlmBackend":
+        import torch
+        super().load()
+        self.pipe.model = torch.ao.quantization.quantize_dynamic(self.pipe.model, {torch.nn.Linear}, dtype=torch.qint8)
+        return self
+
+class Ct2Backend(LlmBackend):
+    """CTranslate2 (already installed with faster-whisper). The model is converted once into
+    DATA_DIR/ct2 (or taken from NEUROOS_LLM_CT2_PATH) with NEUROOS_LLM_CT2_COMPUTE weights."""
+    kind = "ct2"
+    def __init__(self, model_id: str):
+        super().__init__(model_id); self._statics: set = set()
+    def load(self) -> "LlmBackend":
+        import ctranslate2
+        from transformers import AutoTokenizer
+        self._config()
+        compute = os.environ.get("NEUROOS_LLM_CT2_COMPUTE", "int8")
+        path = os.environ.get("NEUROOS_LLM_CT2_PATH") or os.path.join(DATA_DIR, "ct2", "{}-{}".format(re.sub(r"[^\w.-]+", "--", self.model_id), compute))
+        if not os.path.isdir(path):
+            dbg(f"converting {self.model_id} for CTranslate2 into {path}")
+            ctranslate2.converters.TransformersConverter(self.model_id, trust_remote_code=True).convert(path + ".tmp", quantization=compute, force=True)
+            os.replace(path + ".tmp", path)
+        threads = int(os.environ.get("NEUROOS_LLM_THREADS", "0"))
+        self.model = (ctranslate2.Translator if self.is_encdec else ctranslate2.Generator)(path, device="cpu", compute_type=compute, intra_threads=threads)
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_id, trust_remote_code=True)
+        return self
+    def _tokens(self, prompt: str) -> List[str]:
+        return self.tokenizer.convert_ids_to_tokens(self.tokenizer.encode(prompt))
+    def generate(self, prompts: List[str], params: Dict[str, Any]) -> List[str]:
+        toks = [self._tokens(p) for p in prompts]; n = params["max_new_tokens"]
+        if self.is_encdec:
+            res = self.model.translate_batch(toks, beam_size=params.get("num_beams", 1), max_decoding_length=n)
+            ids = [self.tokenizer.convert_tokens_to_ids(r.hypotheses[0]) for r in res]
+        else:
+            res = self.model.generate_batch(toks, max_length=n, sampling_topk=1, include_prompt_in_result=False)
+            ids = [r.sequences_ids[0] for r in res]
+        return [self.tokenizer.decode(i, skip_special_tokens=True) for i in ids]
+    def stream(self, prompt: str, params: Dict[str, Any], probe: GenProbe, prefix: str = "") -> Iterator[str]:
+        if self.is_encdec:
+            yield from super().stream(prompt, params, probe, prefix); return
+        ids: List[int] = []; sent = ""; kw: Dict[str, Any] = {}; toks = self._tokens(prompt)
+        # CTranslate2 keeps the state after a static prompt for good, so only a bounded set of prefixes gets one
+        if prefix and prompt.startswith(prefix) and (prefix in self._statics or len(self._statics) < int(os.environ.get("NEUROOS_LLM_PREFIX_CACHE", "4"))):
+            kw["static_prompt"] = self._tokens(prefix)
+            if prefix in self._statics: probe.reused = len(kw["static_prompt"])
+            self._statics.add(prefix)
+            toks = self.tokenizer.convert_ids_to_tokens(self.tokenizer.encode(prompt[len(prefix):], add_special_tokens=False))
+        for step in self.model.generate_tokens(toks, max_length=params["max_new_tokens"], sampling_topk=1, **kw):
+            if probe.t_first is None: probe.t_first = time.time()
+            ids.append(step.token_id); probe.n = len(ids)
+            text = self.tokenizer.decode(ids, skip_special_tokens=True)
+            if text.endswith("\ufffd"): continue   # incomplete multi-byte character
+            if len(text) > len(sent): yield text[len(sent):]; sent = text
+            if probe.stop or probe.stop_text in sent[-16:]: break
+
+LLM_BACKENDS: Dict[str, type] = {"hf": HfBackend, "int8": Int8Backend, "ct2": Ct2Backend}
+
+def load_llm_backend(kind: str, model_id: str) -> LlmBackend:
+    """The requested backend, loaded; falls back to the plain transformers pipeline when the
+    backend's own dependency is missing (a failing hf load propagates to MODELS)."""
+    for k in dict.fromkeys([kind, "hf"]):
+        try:
+            be = LLM_BACKENDS[k](model_id).load(); dbg("LLM backend: {}".format(be.kind)); return be
+        except Exception as e:
+            if k == "hf": raise
+            dbg("LLM backend {!r} unavailable ({}); falling back".format(k, e))
+    raise RuntimeError("no LLM backend")
+
+class LLMEngine:
+    def __init__(self):
+        self._task=None; self._is_encdec=False
+        self.backend_kind = os.environ.get("NEUROOS_LLM_BACKEND", "hf").lower()
+        self.last: Optional[Dict[str, float]] = None
+        self.n_gen = 0; self.sum_ttft = 0.0; self.sum_tps = 0.0
+        self.n_prefix = 0; self.sum_prefix = 0   # generations that reused a cached prompt prefix, tokens not prefilled
+        self.chunk_tokens = int(os.environ.get("NEUROOS_LLM_CHUNK_TOKENS", "1024"))   # longer contexts are map-reduced
+        self.chunk_overlap = int(os.environ.get("NEUROOS_LLM_CHUNK_OVERLAP", "64"))
+        self.map_batch = max(1, int(os.environ.get("NEUROOS_LLM_BATCH", "4")))
+        self._lock = threading.Lock()   # one pipeline call at a time
+        self._model_id = os.environ.get("NEUROOS_HF_PATH") or os.environ.get("NEUROOS_HF_MODEL","Qwen/Qwen2.5-0.5B-Instruct")
+    def _load(self):
+        """Loader for MODELS["llm"]; returns the loaded LlmBackend."""
+        be = load_llm_backend(self.backend_kind, self._model_id)
+        self._is_encdec, self._task, self.backend_kind = be.is_encdec, be.task, be.kind
+        dbg(f"LLM loaded: {self._model_id} encdec={self._is_encdec} backend={be.kind}")
+        return be
     def available(self)->bool:
-        if not self._ready and not self._err: self._lazy_load()
-        return self._ready
+        return MODELS.get("llm") is not None
     def status(self)->str:
-        if self._ready: return f"[llm] ready ({self._model_id})"
-        if self._err: return f"[llm] error: {self._err}"
-        return "[llm] loading…"
+        state = MODELS.state("llm")
+        if state == "ready": line = f"[llm] ready ({self._model_id}, {self.backend_kind}) {MODELS.describe('llm')}"
+        elif state == "error": line = f"[llm] error: {MODELS.error('llm')}"
+        elif state == "loading": line = f"[llm] loading… ({self._model_id}) {MODELS.describe('llm')}"
+        else: line = f"[llm] {MODELS.describe('llm')} ({self._model_id}); loads on first question"
+        if self.n_gen:
+            line += " | {} generated, avg {:.2f}s to first token, {:.1f} tok/s".format(self.n_gen, self.sum_ttft / self.n_gen, self.sum_tps / self.n_gen)
+        if self.n_prefix:
+            line += " | prompt prefix reused {} times ({} tokens not prefilled)".format(self.n_prefix, self.sum_prefix)
+        return f"{line} | {ANSWERS.stats()} | {NOTES.stats()}"
+    def _prompt_prefix(self, ctx:Optional[str])->str:
+        """Part of the prompt shared by every question (and every follow-up on the same
+        context); empty for encoder-decoder models, whose encoder sees the question too."""
+        if self._is_encdec: return ""
+        return "You are factual and concise.\nContext:\n{}\n\n".format(ctx) if ctx else "You are factual and concise.\n"
     def _build_prompt(self, q:str, ctx:Optional[str])->str:
         if self._is_encdec:
             return ("Use the context to answer concisely.\nContext:\n{}\n\nQuestion: {}\nAnswer:"
                     .format(ctx, q)) if ctx else ("Answer concisely: {}".format(q))
-        return ("You are factual and concise.\nContext:\n{}\n\nQ: {}\nA:".format(ctx,q)) if ctx else ("You are factual and concise.\nQ: {}\nA:".format(q))
-    def answer(self, prompt:str, context:Optional[str]=None, max_new_tokens:int=128)->Optional[str]:
+        return "{}Q: {}\nA:".format(self._prompt_prefix(ctx), q)
+    def _gen_params(self, max_new_tokens:int)->Dict[str, Any]:
+        if self._task=="text2text-generation":
+            return dict(max_new_tokens=max_new_tokens, num_beams=4, do_sample=False)
+        return dict(max_new_tokens=max_new_tokens, do_sample=False, return_full_text=False)
+    def _cache_key(self, q:str, ctx:Optional[str], max_new_tokens:int)->str:
+        model = self._model_id if self.backend_kind=="hf" else f"{self._model_id}@{self.backend_kind}"
+        return ANSWERS.key(model, self._build_prompt(q, ctx), self._gen_params(max_new_tokens))
+    @traced("llm.stream", lambda self, prompt, *a, **k: {"prompt": prompt[:80]})
+    def stream(self, prompt:str, context:Optional[str]=None, max_new_tokens:int=128,
+               progress:Optional[Callable[[int, int], None]]=None)->Iterator[str]:
+        """Yields the answer as it is generated (rule and cached answers in one piece).
+        self.last holds time-to-first-token/tokens per second of the latest generation.
+        A context over chunk_tokens is map-reduced; progress(parts done, parts estimated)
+        is called after each batch of parts, and returning False abandons the answer."""
+        self.last = None
         ra = qa_rule_answer(prompt)
-        if ra: return ra
-        if not self.available(): return None
+        if ra: yield ra; return
+        q = prompt.strip(); known = self._task is not None
+        if context is None: context = NOTES.context(q) or None   # ground plain questions in the user's notes
+        key = self._cache_key(q, context, max_new_tokens)
+        hit = ANSWERS.get(key, count=known)   # a hit needs no model at all
+        if hit is not None: yield hit; return
+        be = MODELS.get("llm")
+        if be is None: return
+        if not known:   # prompt template and generation settings are only certain once the model config is loaded
+            key = self._cache_key(q, context, max_new_tokens); hit = ANSWERS.get(key)
+            if hit is not None: yield hit; return
+        t0 = time.time(); parts: List[str] = []
         try:
-            q = self._build_prompt(prompt.strip(), context)
-            if self._task=="text2text-generation":
-                out = self._pipe(q, max_new_tokens=max_new_tokens, num_beams=4, do_sample=False)
-                return (out[0].get("generated_text") or "").strip() or None
-            out = self._pipe(q, max_new_tokens=max_new_tokens, do_sample=False, return_full_text=False)
-            text = (out[0].get("generated_text") or "").strip()
-            text = re.split(r"\nQ:\s*", text)[0].strip()
-            return text or None
+            if context and self._too_long(be, context): gen = self._map_reduce(be, q, context, max_new_tokens, progress)
+            else: gen = self._generate(be, self._build_prompt(q, context), self._gen_params(max_new_tokens), self._prompt_prefix(context))
+            for piece in gen:
+                parts.append(piece); yield piece
         except Exception as e:
-            log_ex(e); return None
+            log_ex(e); return
+        text = "".join(parts).strip()
+        if text: ANSWERS.put(key, text, time.time() - t0)
+    def _too_long(self, be:LlmBackend, context:str)->bool:
+        if len(context) <= self.chunk_tokens: return False   # never more tokens than characters
+        return len(context) > 8 * self.chunk_tokens or be.count_tokens(context) > self.chunk_tokens
+    def _map_reduce(self, be:LlmBackend, q:str, context:str, max_new_tokens:int,
+                    progress:Optional[Callable[[int, int], None]])->Iterator[str]:
+        """Summarizes overlapping chunks of context in batches, folds the notes into one whenever
+        they near chunk_tokens, then answers q from the notes. Memory stays at one batch of
+        chunks plus the notes. Chunks are cut on this thread: count_tokens and generate share
+        the backend's tokenizer, which is not safe to use from two threads at once."""
+        part_q, part_n = "Summarize this part of a longer text in 2-3 sentences.", 96
+        chunks = chunk_text(context, be.count_tokens, self.chunk_tokens, self.chunk_overlap)
+        notes: List[str] = []; done = 0; chars = 0
+        def fold():
+            joined = "\n".join(notes)
+            if be.count_tokens(joined) + 2 * part_n > self.chunk_tokens:
+                notes[:] = [n for n in self.answer_batch([(part_q, joined, part_n)]) if n]
+        while True:
+            batch = list(islice(chunks, self.map_batch))
+            if not batch: break
+            notes.extend(n for n in self.answer_batch([(part_q, c, part_n) for c in batch]) if n)
+            done += len(batch); chars += sum(len(c) for c in batch)
+            if progress and progress(done, max(done, round(done * len(context) / chars))) is False: return
+            fold()
+        if notes: yield from self._generate(be, self._build_prompt(q, "\n".join(notes)), self._gen_params(max_new_tokens))
+    @traced("llm.generate")
+    def _generate(self, be:LlmBackend, prompt:str, params:Dict[str, Any], prefix:str="")->Iterator[str]:
+        """Streams the backend's answer up to the "\nQ:" the model starts its next turn with;
+        generation stops there too (and when the consumer stops reading)."""
+        t0 = time.time(); probe = GenProbe("\nQ:"); lead = True
+        with self._lock:
+            gen = be.stream(prompt, params, probe, prefix)
+            try:
+                for piece in until_delimiter(gen, "\nQ:"):
+                    if lead: piece = piece.lstrip(); lead = not piece
+                    if piece: yield piece
+            finally:
+                probe.stop = True; gen.close()
+                self._record(t0, probe.t_first or time.time(), probe.n, time.time())
+                if probe.reused: self.n_prefix += 1; self.sum_prefix += probe.reused
+    def _record(self, t0:float, t_first:float, tokens:int, t_end:float)->None:
+        tps = (tokens - 1) / (t_end - t_first) if tokens > 1 and t_end > t_first else 0.0
+        self.last = {"ttft": t_first - t0, "tokens": tokens, "tps": tps, "total": t_end - t0}
+        self.n_gen += 1; self.sum_ttft += t_first - t0; self.sum_tps += tps
+        METRICS.inc("neuroos_llm_tokens_total", tokens); METRICS.observe("neuroos_llm_ttft_seconds", t_first - t0)
+        if tps: METRICS.observe("neuroos_llm_tokens_per_second", tps)
+    @traced("llm.answer")
+    def answer(self, prompt:str, context:Optional[str]=None, max_new_tokens:int=128)->Optional[str]:
+        return "".join(self.stream(prompt, context, max_new_tokens)).strip() or None
+    @traced("llm.answer_batch", lambda self, items: {"n": len(items)})
+    def answer_batch(self, items:List[Tuple[str, Optional[str], int]])->List[Optional[str]]:
+        """Answers (prompt, context, max_new_tokens) items; those not answered by rules or the
+        cache go through one batched backend call per max_new_tokens value."""
+        items = list(items); out: List[Optional[str]] = [None] * len(items); todo: Dict[int, List[int]] = {}
+        for i, (p, ctx, n) in enumerate(items):
+            if ctx is None and not qa_rule_answer(p): ctx = NOTES.context(p.strip()) or None; items[i] = (p, ctx, n)
+            hit = qa_rule_answer(p) or ANSWERS.get(self._cache_key(p.strip(), ctx, n), count=self._task is not None)
+            if hit is not None: out[i] = hit
+            else: todo.setdefault(n, []).append(i)
+        if not todo: return out
+        be = MODELS.get("llm")
+        if be is None: return out
+        self.last = None
+        for n, idx in todo.items():
+            prompts = [self._build_prompt(items[i][0].strip(), items[i][1]) for i in idx]
+            t0 = time.time()
+            try:
+                with self._lock: res = be.generate(prompts, self._gen_params(n))
+            except Exception as e:
+                log_ex(e); continue
+            took = (time.time() - t0) / len(idx)
+            for i, text in zip(idx, res):
+                text = text.strip()
+                if self._task!="text2text-generation": text = re.split(r"\nQ:\s*", text)[0].strip()
+                out[i] = text or None
+                if text: ANSWERS.put(self._cache_key(items[i][0].strip(), items[i][1], n), text, took)
+        return out
+
+def chunk_text(text: str, count: Callable[[str], int], size: int, overlap: int) -> Iterator[str]:
+    """Cuts text at sentence and line ends into chunks of at most ~size tokens (count(s) ->
+    tokens), each starting with ~overlap tokens from the end of the previous one. Pieces
+    are counted one at a time, so memory stays at one chunk however long the text is."""
+    cur: deque = deque(); total = 0
+    def pieces():
+        for m in re.finditer(r"[^.!?\n]*(?:[.!?]+\S*\s*|\n\s*|$)", text):
+            p = m.group()
+            if not p: continue
+            n = count(p)
+            if n <= size: yield p, n; continue
+            step = max(1, len(p) * size // (2 * n))   # no sentence end in sight: fixed-width slices
+            for i in range(0, len(p), step): yield p[i:i + step], count(p[i:i + step])
+    for p, n in pieces():
+        if cur and total + n > size:
+            yield "".join(x for x, _ in cur)
+            while cur and (total > overlap or total + n > size): total -= cur.popleft()[1]
+        cur.append((p, n)); total += n
+    if cur: yield "".join(x for x, _ in cur)
+
+def until_delimiter(chunks, delim: str) -> Iterator[str]:
+    """Passes text chunks through up to (not including) delim, holding back only a tail
+    that could be the start of a delim split across chunks."""
+    buf = ""
+    for c in chunks:
+        buf += c
+        i = buf.find(delim)
+        if i >= 0:
+            if buf[:i]: yield buf[:i]
+            return
+        k = next((k for k in range(len(delim) - 1, 0, -1) if buf.endswith(delim[:k])), 0)
+        if len(buf) > k: yield buf[:len(buf) - k]; buf = buf[len(buf) - k:]
+    if buf: yield buf
 
 LLM = LLMEngine()
+MODELS.register("llm", LLM._load, est_mb=1500)
+
+# --------- LLM jobs ----------
+class LLMJob:
+    def __init__(self, prompt: str, context: Optional[str], max_new_tokens: int, priority: int, group: Optional[str],
+                 on_chunk: Optional[Callable[["LLMJob", str], None]], on_done: Optional[Callable[["LLMJob", Optional[str]], None]],
+                 on_progress: Optional[Callable[["LLMJob", int, int], None]] = None):
+        self.prompt, self.context, self.max_new_tokens = prompt, context, max_new_tokens
+        self.priority, self.group, self.on_chunk, self.on_done = priority, group, on_chunk, on_done
+        self.on_progress = on_progress   # (job, parts done, parts estimated) while a long context is map-reduced
+        self.cancelled = threading.Event(); self.done = threading.Event()
+        self.result: Optional[str] = None
+        self.stats: Optional[Dict[str, float]] = None   # LLMEngine.last of a streamed generation
+        self.streamed = False
+        self.parts = 0   # context parts read so far when a long context is map-reduced
+    def cancel(self) -> None:
+        self.cancelled.set()
+
+class LLMScheduler:
+    """Runs LLM jobs on one worker thread so neither the REPL nor the voice consumer waits on
+    generation. Lower priority first, then FIFO. A job submitted with a group supersedes
+    (cancels) the queued or running jobs of that group. Queued jobs with the same
+    max_new_tokens are taken together and answered by one batched backend call."""
+    def __init__(self, engine: LLMEngine, batch_max: int = 4):
+        self.engine, self.batch_max = engine, batch_max
+        self._heap: List[Tuple[int, int, LLMJob]] = []; self._seq = 0
+        self._cv = threading.Condition()
+        self._running: List[LLMJob] = []
+        self._thread: Optional[threading.Thread] = None
+        self.n_done = self.n_cancelled = self.n_batched = 0
+    def submit(self, prompt: str, context: Optional[str] = None, max_new_tokens: int = 128, priority: int = 1,
+               group: Optional[str] = None, on_chunk=None, on_done=None, on_progress=None) -> LLMJob:
+        job = LLMJob(prompt, context, max_new_tokens, priority, group, on_chunk, on_done, on_progress)
+        with self._cv:
+            if group:
+                for j in [j for _, _, j in self._heap] + self._running:
+                    if j.group == group: j.cancel()
+            heapq.heappush(self._heap, (priority, self._seq, job)); self._seq += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._work, daemon=True); self._thread.start()
+            self._cv.notify()
+        return job
+    def waiting(self) -> int:
+        """Live jobs ahead of a new submission (queued or running)."""
+        with self._cv:
+            return sum(1 for _, _, j in self._heap if not j.cancelled.is_set()) + len(self._running)
+    def _take(self) -> List[LLMJob]:
+        with self._cv:
+            while True:
+                while not self._heap: self._cv.wait()
+                head = heapq.heappop(self._heap)[2]
+                if not head.cancelled.is_set(): break
+                self._finish(head, None)
+            batch = [head]
+            if self.batch_max > 1:
+                short = lambda j: len(j.context or "") <= self.engine.chunk_tokens   # long contexts are map-reduced alone
+                same = [e for e in self._heap if e[2].max_new_tokens == head.max_new_tokens and short(e[2]) and not e[2].cancelled.is_set()] if short(head) else []
+                for e in sorted(same)[:self.batch_max - 1]:
+                    self._heap.remove(e); batch.append(e[2])
+                heapq.heapify(self._heap)
+            self._running = batch
+            return batch
+    def _work(self) -> None:
+        while True:
+            batch = self._take()
+            try:
+                if len(batch) == 1: self._run_one(batch[0])
+                else: self._run_batch(batch)
+            except Exception as e:
+                log_ex(e)
+                for j in batch:
+                    if not j.done.is_set(): self._finish(j, None)
+            with self._cv: self._running = []
+    def _run_one(self, job: LLMJob) -> None:
+        parts: List[str] = []
+        def progress(done: int, total: int) -> bool:
+            job.parts = done
+            if job.on_progress and not job.cancelled.is_set(): job.on_progress(job, done, total)
+            return not job.cancelled.is_set()
+        gen = self.engine.stream(job.prompt, job.context, job.max_new_tokens, progress)
+        try:
+            for piece in gen:
+                if job.cancelled.is_set(): break   # closing the stream stops generation at the next token
+                parts.append(piece)
+                if job.on_chunk: job.on_chunk(job, piece)
+                job.streamed = True
+        finally:
+            gen.close()
+        job.stats = self.engine.last
+        self._finish(job, "".join(parts).strip() or None)
+    def _run_batch(self, jobs: List[LLMJob]) -> None:
+        self.n_batched += len(jobs)
+        texts = self.engine.answer_batch([(j.prompt, j.context, j.max_new_tokens) for j in jobs])
+        for j, text in zip(jobs, texts):
+            if text and j.on_chunk and not j.cancelled.is_set(): j.on_chunk(j, text); j.streamed = True
+            self._finish(j, text)
+    def _finish(self, job: LLMJob, text: Optional[str]) -> None:
+        job.result = text
+        if job.cancelled.is_set(): self.n_cancelled += 1
+        else: self.n_done += 1
+        if job.on_done:
+            try: job.on_done(job, text)
+            except Exception as e: log_ex(e)
+        job.done.set()
+    def status(self) -> str:
+        with self._cv:
+            queued = sum(1 for _, _, j in self._heap if not j.cancelled.is_set())
+        return "[llm] jobs: {} queued, {} running, {} done, {} superseded, {} answered in batches".format(
+            queued, len(self._running), self.n_done, self.n_cancelled, self.n_batched)
+
+LLM_JOBS = LLMScheduler(LLM, batch_max=max(1, int(os.environ.get("NEUROOS_LLM_BATCH", "4"))))
 
 # --------- intents ----------
 OPEN_VERBS  = r"(open|launch|start|run|load|i want|i wanna|please|pls)"
@@ -466,17 +2264,23 @@ STOP_VERBS  = r"(stop|pause|halt)"
 REMIND_WORD = r"(remind|reminder|remember)"
 QUESTION_LIKE = re.compile(r"^\s*(who|what|when|where|why|how|which|whom)\b", re.I)
 INTENT_PATTERNS = [
+    ("voice_start", re.compile(r"^voice (on|start)(?:\s+(.+))?$", re.I)),   # ahead of open_app: "voice start 2" is a device, not an app
     ("open_workspace", re.compile(rf"\b{OPEN_VERBS}\b.*\b(workspace)\b\s*(\w+)?|^open\s+workspace\s+(\w+)$", re.I)),
     ("save_workspace", re.compile(r"^save\s+workspace\s+([a-z0-9_-]+)$", re.I)),
     ("open_multi_apps", re.compile(rf"\b{OPEN_VERBS}\b\s+([a-z0-9 .]+?)(?:\s+and\s+([a-z0-9 .]+))+$", re.I)),
     ("open_app", re.compile(rf"\b{OPEN_VERBS}\b\s+([a-z0-9 .]+)$", re.I)),
     ("open_url", re.compile(r"\b(open|launch)\b\s+(https?://[^\s]+)", re.I)),
+    ("search_with_selection", re.compile(r"\b(search|google|look up|find)\b\s+(this|selection|selected text|it)\s*$", re.I)),
     ("search_web", re.compile(r"\b(search|google|look up|find)\b\s+(for\s+)?(.+)$", re.I)),
-    ("note_text", re.compile(r"\b(take|make|create|add|append)\b.*\b(note|notes)\b.*?(?:about|that|:)?\s*(.+)$", re.I)),
+    ("note_history", re.compile(r"^(?:show|read|list)\s+(?:my\s+)?notes?\s+history(?:\s+(?:of|for))?(?:\s+(.+))?$", re.I)),
     ("add_to_titled_note", re.compile(r"\badd\b\s+(.+?)\s+\bto\b\s+(?:note|notes)\s+(.+)$", re.I)),
-    ("send_selection_to", re.compile(rf"\b(send|save|add|append)\b\s+(?:from\s+([a-z0-9 .]+)\s+)?(this|selection|selected text|it)?\s*\b(to|into|in)\b\s+(notes?|reminders?|textedit|mail|file)\b", re.I)),
-    ("search_with_selection", re.compile(r"\b(search|google|look up|find)\b\s+(this|selection|selected text|it)\b", re.I)),
-    ("email_selection", re.compile(r"\b(email|mail)\b\s+(this|selection|selected text|it)\s+(?:to\s+([^\s]+))?(?:\s+subject\s+(.+))?$", re.I)),
+    ("note_text", re.compile(r"\b(take|make|create|add|append)\b.*\b(note|notes)\b\s*(?:(?:about|that)\b|:)?\s*(.+)$", re.I)),
+    ("send_selection_to", re.compile(rf"\b(send|save|add|append)\b\s+(?:from\s+([a-z0-9 .]+?)\s+)?(this|selection|selected text|it)?\s*\b(to|into|in)\b\s+(notes?|reminders?|textedit|mail|file)\b", re.I)),
+    ("email_selection", re.compile(r"\b(email|mail)\b\s+(this|selection|selected text|it)(?:\s+to\s+([^\s]+))?(?:\s+subject\s+(.+))?$", re.I)),
+    ("reminders_list", re.compile(r"^(?:(list|show)\s+(?:my\s+|all\s+)?)?reminders$", re.I)),
+    ("reminder_cancel", re.compile(r"^(cancel|delete|remove)\s+reminder\s+#?(\d+)$", re.I)),
+    ("reminder_snooze", re.compile(r"^snooze(?:\s+reminder)?(?:\s+#?(\d+))?(?:\s+(?:for|by))?(?:\s+(\d{1,4})\s*(seconds?|secs?|s|minutes?|mins?|m|hours?|hrs?|h))?$", re.I)),
+    ("remind_every", re.compile(rf"\b{REMIND_WORD}\b.*\bevery\s+(?:(\d{{1,4}})\s*)?(seconds?|secs?|minutes?|mins?|hours?|hrs?|days?)\b.*?(?:to|for)\s+(.+)$", re.I)),
     ("remind_for_rel", re.compile(rf"\b(remind|reminder)\b.*\b(for|in|after)\b.*\b(\d+)\s*(seconds?|secs?|s|minutes?|mins?|m|hours?|hrs?|h)\b.*?(?:to|for)\s+(.+)$", re.I)),
     ("remind_in", re.compile(rf"\b{REMIND_WORD}\b.*\b(in|after|for)\b", re.I)),
     ("remind_at", re.compile(rf"\b{REMIND_WORD}\b.*\bat\b", re.I)),
@@ -486,88 +2290,188 @@ INTENT_PATTERNS = [
     ("ask_llm", re.compile(r"^(ask|question)\s+(.+)$", re.I)),
     ("explain_selection", re.compile(r"^(explain|what does this mean)\s+(this|selection|selected text|it)?$", re.I)),
     ("summarize_selection", re.compile(r"^(summarize|tl;dr)\s+(this|selection|selected text|it)?$", re.I)),
-    ("voice_start", re.compile(r"^voice (on|start)(?:\s+(.+))?$", re.I)),
     ("voice_stop", re.compile(r"^voice (off|stop)$", re.I)),
     ("voice_status", re.compile(r"^voice status$", re.I)),
     ("voice_devices", re.compile(r"^voice devices$", re.I)),
     ("voice_test", re.compile(r"^voice test$", re.I)),
     ("llm_status", re.compile(r"^llm status$", re.I)),
+    ("trace", re.compile(r"^trace\s+(on|off|dump)$", re.I)),
+    ("metrics", re.compile(r"^(?:show\s+)?metrics$", re.I)),
     ("do_again", re.compile(r"\b(do it again|again|same again|repeat that)\b", re.I)),
 ]
 
+@traced("fuzzy_match_any_appphrase")
 def fuzzy_match_any_appphrase(text: str) -> Optional[str]:
-    hay = text.replace("visualstudio", "visual studio")
-    candidates = list(APP_SYNONYMS.keys()) + list(APP_CANONICALS.keys())
-    best, score = None, 0.0
-    for c in candidates:
-        if c in hay: return c
-        r = difflib.SequenceMatcher(None, hay, c).ratio()
-        if r > score: best, score = c, r
-    return best if score >= 0.70 else None
+    return APP_NAMES.phrase_match(text.replace("visualstudio", "visual studio"), "phrases", 0.70)
+
+# Words a pattern cannot match without. Each tuple entry is a group; at least one word
+# of every group must be a token of the normalized text before the regex is even tried.
+_OPEN_WORDS = ("open","launch","start","run","load","want","wanna","please","pls")
+_REMIND_WORDS = ("remind","reminder","remember")
+_SEARCH_WORDS = ("search","google","look","find")
+_SEL_WORDS = ("this","selection","selected","it")
+_MEDIA_WORDS = ("music","song","playlist")
+INTENT_ANCHORS: Dict[str, Tuple[Tuple[str, ...], ...]] = {
+    "open_workspace": (("workspace",),),
+    "save_workspace": (("save",), ("workspace",)),
+    "open_multi_apps": (_OPEN_WORDS, ("and",)),
+    "open_app": (_OPEN_WORDS,),
+    "open_url": (("open","launch"),),
+    "search_web": (_SEARCH_WORDS,),
+    "note_history": (("note","notes"), ("history",)),
+    "note_text": (("note","notes"), ("take","make","create","add","append")),
+    "add_to_titled_note": (("note","notes"), ("add",), ("to",)),
+    "send_selection_to": (("notes","note","reminders","reminder","textedit","mail","file"),
+                          ("send","save","add","append"), ("to","into","in")),
+    "search_with_selection": (_SEARCH_WORDS, _SEL_WORDS),
+    "email_selection": (("email","mail"), _SEL_WORDS),
+    "reminders_list": (("reminders",),),
+    "reminder_cancel": (("reminder",), ("cancel","delete","remove")),
+    "reminder_snooze": (("snooze",),),
+    "remind_every": (_REMIND_WORDS, ("every",)),
+    "remind_for_rel": (("remind","reminder"), ("for","in","after")),
+    "remind_in": (_REMIND_WORDS, ("in","after","for")),
+    "remind_at": (("at",), _REMIND_WORDS),
+    "play_music": (_MEDIA_WORDS, ("play","start")),
+    "stop_music": (_MEDIA_WORDS, ("stop","pause","halt")),
+    "open_file_direct": (("open","view","show"),),
+    "ask_llm": (("ask","question"),),
+    "explain_selection": (("explain","what"),),
+    "summarize_selection": (("summarize","tl"),),
+    "voice_start": (("voice",), ("on","start")),
+    "voice_stop": (("voice",), ("off","stop")),
+    "voice_status": (("voice",), ("status",)),
+    "voice_devices": (("voice",), ("devices",)),
+    "voice_test": (("voice",), ("test",)),
+    "llm_status": (("llm",), ("status",)),
+    "trace": (("trace",),),
+    "metrics": (("metrics",),),
+    "do_again": (("again","repeat"),),
+}
+
+class IntentMatcher:
+    """Ordered regex intents behind a keyword prefilter.
+
+    Built once: every pattern gets a bit, each anchor word maps to the bits of the
+    patterns it can unlock. Matching tokenizes once, ORs the bits of the tokens and
+    only runs the surviving regexes, lowest bit (= highest priority) first.
+    """
+    TOKEN_RX = re.compile(r"\w+")
+    def __init__(self, patterns: List[Tuple[str, "re.Pattern[str]"]], anchors: Dict[str, Tuple[Tuple[str, ...], ...]]):
+        self._patterns = list(patterns)
+        self._index: Dict[str, int] = {}
+        self._rest: List[Tuple[frozenset, ...]] = []
+        self._always = 0
+        for i, (name, _) in enumerate(self._patterns):
+            groups = anchors.get(name) or ()
+            if not groups:
+                self._always |= 1 << i; self._rest.append(()); continue
+            for w in groups[0]: self._index[w] = self._index.get(w, 0) | (1 << i)
+            self._rest.append(tuple(frozenset(g) for g in groups[1:]))
+    def match(self, t: str) -> Tuple[Optional[str], Optional["re.Match[str]"]]:
+        toks = set(self.TOKEN_RX.findall(t))
+        mask = self._always
+        for w in toks: mask |= self._index.get(w, 0)
+        while mask:
+            low = mask & -mask; mask ^= low
+            i = low.bit_length() - 1
+            if any(toks.isdisjoint(g) for g in self._rest[i]): continue
+            name, rx = self._patterns[i]
+            m = rx.search(t)
+            if m: return name, m
+        return None, None
 
+_OPEN_VERB_RX = re.compile(OPEN_VERBS)
+_LEADING_OPEN_VERB = re.compile(rf"^{OPEN_VERBS}\s+", re.I)
+_APP_LIST_SEP = re.compile(r"\s+and\s+|, ", re.I)
+_REMIND_TAIL = re.compile(rf"\b{REMIND_WORD}\b.*?(in|after|for)\b.*", re.I)
+_FALLBACK_SEARCH = re.compile(r"\b(search|find|google)\b\s+(.+)$", re.I)
+
+def _slots_open_multi_apps(m, t):
+    verb_match = _OPEN_VERB_RX.search(t); start = verb_match.end() if verb_match else 0
+    wanted = []
+    for a in _APP_LIST_SEP.split(t[start:].strip()):
+        a = _LEADING_OPEN_VERB.sub("", a).strip()
+        if a: wanted.append(a)
+    return "open_multi_apps", {"apps_raw": wanted}, 0.88
+def _unit_norm(unit: str) -> str:
+    unit = unit.lower()
+    if unit.startswith("day"): return "days"
+    return "hours" if unit.startswith(("hour","hr","h")) else "seconds" if unit.startswith(("sec","s")) else "minutes"
+def _slots_remind_for_rel(m, t):
+    n = int(m.group(3)); msg = m.group(5).strip()
+    return "remind", {"message": msg, "rel": (_unit_norm(m.group(4)), n)}, 0.9
+def _slots_remind_every(m, t):
+    slots: Dict[str, Any] = {"message": m.group(4).strip(), "every": (_unit_norm(m.group(3)), int(m.group(2) or 1))}
+    at = re.search(r"\bat\s+\d", t)   # "every day at 9 am to ..."
+    if at: slots["at"] = parse_time_at(t[at.start():]); slots["message"] = extract_message_after_at(t[at.start():]) or slots["message"]
+    return "remind", slots, 0.9
+def _slots_reminder_snooze(m, t):
+    rel = (_unit_norm(m.group(3)), int(m.group(2))) if m.group(2) else None
+    return "reminder_snooze", {"id": int(m.group(1)) if m.group(1) else None, "rel": rel}, 0.95
+def _slots_remind_in(m, t):
+    msg = extract_message_after_relative(t) or _REMIND_TAIL.sub("", t).strip() or "Reminder"
+    return "remind", {"message": msg, "rel": parse_time_relative(t)}, 0.88
+def _slots_open_file_direct(m, t):
+    target = m.group(2).strip()
+    if target.startswith("http"): return "open_url", {"url": target}, 0.9
+    return "open_file", {"target": target}, 0.9
+def _slots_do_again(m, t):
+    if CTX.last_intent: return CTX.last_intent, CTX.last_slots, 0.88
+    return None, {}, 0.0
+
+# name -> (match, normalized text) -> (intent, slots, confidence)
+INTENT_SLOTS: Dict[str, Callable[["re.Match[str]", str], Tuple[Optional[str], Dict[str, Any], float]]] = {
+    "open_workspace": lambda m, t: ("open_workspace", {"workspace": (m.group(3) or m.group(4) or "").strip().lower() or (CTX.last_workspace or "coding")}, 0.9),
+    "save_workspace": lambda m, t: ("save_workspace", {"name": m.group(1).lower()}, 0.95),
+    "open_multi_apps": _slots_open_multi_apps,
+    "open_app": lambda m, t: ("open_app", {"app_raw": _LEADING_OPEN_VERB.sub("", m.group(2).strip())}, 0.86),   # "please open x"
+    "open_url": lambda m, t: ("open_url", {"url": m.group(2)}, 0.98),
+    "search_web": lambda m, t: ("search_web", {"query": m.group(3).strip()}, 0.9),
+    "note_history": lambda m, t: ("note_history", {"title": (m.group(1) or "").strip() or "Quick Notes"}, 0.95),
+    "note_text": lambda m, t: ("note_text", {"title":"Quick Notes","body": m.group(3).strip()}, 0.9),
+    "add_to_titled_note": lambda m, t: ("add_to_titled_note", {"title": m.group(2).strip(), "body": m.group(1).strip()}, 0.9),
+    "send_selection_to": lambda m, t: ("send_selection_to", {"source_app": (m.group(2) or "").strip() or None, "dest": m.group(5).lower()}, 0.92),
+    "search_with_selection": lambda m, t: ("search_with_selection", {}, 0.9),
+    "email_selection": lambda m, t: ("email_selection", {"to": (m.group(3) or "").strip() or None, "subject": (m.group(4) or "Note").strip()}, 0.92),
+    "reminders_list": lambda m, t: ("reminders_list", {}, 0.95),
+    "reminder_cancel": lambda m, t: ("reminder_cancel", {"id": int(m.group(2))}, 0.95),
+    "reminder_snooze": _slots_reminder_snooze,
+    "remind_every": _slots_remind_every,
+    "remind_for_rel": _slots_remind_for_rel,
+    "remind_in": _slots_remind_in,
+    "remind_at": lambda m, t: ("remind", {"message": extract_message_after_at(t) or "Reminder", "at": parse_time_at(t)}, 0.88),
+    "play_music": lambda m, t: ("play_music", {}, 0.9),
+    "stop_music": lambda m, t: ("stop_music", {}, 0.9),
+    "open_file_direct": _slots_open_file_direct,
+    "ask_llm": lambda m, t: ("ask_llm", {"query": m.group(2).strip()}, 0.95),
+    "explain_selection": lambda m, t: ("explain_selection", {}, 0.95),
+    "summarize_selection": lambda m, t: ("summarize_selection", {}, 0.95),
+    "voice_start": lambda m, t: ("voice_start", {"target": (m.group(2) or "").strip()}, 1.0),
+    "voice_stop": lambda m, t: ("voice_stop", {}, 1.0),
+    "voice_status": lambda m, t: ("voice_status", {}, 1.0),
+    "voice_devices": lambda m, t: ("voice_devices", {}, 1.0),
+    "voice_test": lambda m, t: ("voice_test", {}, 1.0),
+    "llm_status": lambda m, t: ("llm_status", {}, 1.0),
+    "trace": lambda m, t: ("trace", {"mode": m.group(1).lower()}, 1.0),
+    "metrics": lambda m, t: ("metrics", {}, 1.0),
+    "do_again": _slots_do_again,
+}
+
+INTENTS = IntentMatcher(INTENT_PATTERNS, INTENT_ANCHORS)
+
+@traced("parse_intent")
 def parse_intent(raw_text: str):
     t = normalize_text(raw_text)
     if not t: return None, {}, 0.0
     url = detect_url(t)
     if url: return "open_url", {"url": url}, 0.98
-    for name, rx in INTENT_PATTERNS:
-        m = rx.search(t)
-        if not m: continue
-        if name == "open_workspace":
-            ws = (m.group(2) or m.group(3) or "").strip().lower() or (CTX.last_workspace or "coding")
-            return "open_workspace", {"workspace": ws}, 0.9
-        if name == "save_workspace": return "save_workspace", {"name": m.group(1).lower()}, 0.95
-        if name == "open_multi_apps":
-            verb_match = re.search(OPEN_VERBS, t); start = verb_match.end() if verb_match else 0
-            seg = t[start:].strip()
-            apps = re.split(r"\s+and\s+|, ", seg, flags=re.I)
-            wanted = []
-            for a in apps:
-                a = re.sub(rf"^{OPEN_VERBS}\s+", "", a, flags=re.I).strip()
-                if a: wanted.append(a)
-            return "open_multi_apps", {"apps_raw": wanted}, 0.88
-        if name == "open_app":   return "open_app", {"app_raw": m.group(1).strip()}, 0.86
-        if name == "open_url":   return "open_url", {"url": m.group(2)}, 0.98
-        if name == "search_web": return "search_web", {"query": m.group(3).strip()}, 0.9
-        if name == "note_text":  return "note_text", {"title":"Quick Notes","body": m.group(3).strip()}, 0.9
-        if name == "add_to_titled_note": return "add_to_titled_note", {"title": m.group(2).strip(), "body": m.group(1).strip()}, 0.9
-        if name == "send_selection_to":
-            src = (m.group(2) or "").strip(); dest = m.group(5).lower()
-            return "send_selection_to", {"source_app": src or None, "dest": dest}, 0.92
-        if name == "search_with_selection": return "search_with_selection", {}, 0.9
-        if name == "email_selection":
-            to_addr = (m.group(3) or "").strip() or None; subject = (m.group(4) or "Note").strip()
-            return "email_selection", {"to": to_addr, "subject": subject}, 0.92
-        if name == "remind_for_rel":
-            n = int(m.group(3)); unit = m.group(4); msg = m.group(5).strip()
-            unit_norm = "hours" if unit.lower().startswith(("hour","hr","h")) else "seconds" if unit.lower().startswith(("sec","s")) else "minutes"
-            return "remind", {"message": msg, "rel": (unit_norm, n)}, 0.9
-        if name == "remind_in":
-            msg = extract_message_after_relative(t) or re.sub(rf"\b{REMIND_WORD}\b.*?(in|after|for)\b.*", "", t, flags=re.I).strip() or "Reminder"
-            return "remind", {"message": msg, "rel": parse_time_relative(t)}, 0.88
-        if name == "remind_at":
-            msg = extract_message_after_at(t) or "Reminder"
-            return "remind", {"message": msg, "at": parse_time_at(t)}, 0.88
-        if name == "play_music":  return "play_music", {}, 0.9
-        if name == "stop_music":  return "stop_music", {}, 0.9
-        if name == "open_file_direct":
-            return "open_url" if m.group(2).startswith("http") else ("open_file", {"target": m.group(2).strip()}, 0.9)
-        if name == "ask_llm":            return "ask_llm", {"query": m.group(2).strip()}, 0.95
-        if name == "explain_selection":  return "explain_selection", {}, 0.95
-        if name == "summarize_selection":return "summarize_selection", {}, 0.95
-        if name == "voice_start": return "voice_start", {"target": (m.group(2) or "").strip()}, 1.0
-        if name == "voice_stop":  return "voice_stop", {}, 1.0
-        if name == "voice_status": return "voice_status", {}, 1.0
-        if name == "voice_devices": return "voice_devices", {}, 1.0
-        if name == "voice_test": return "voice_test", {}, 1.0
-        if name == "llm_status":   return "llm_status", {}, 1.0
-        if name == "do_again":
-            if CTX.last_intent: return CTX.last_intent, CTX.last_slots, 0.88
-            return None, {}, 0.0
+    name, m = INTENTS.match(t)
+    if name: return INTENT_SLOTS[name](m, t)
     cand = fuzzy_match_any_appphrase(t)
     if cand: return "open_app", {"app_raw": cand}, 0.72
     if t.endswith("?") or QUESTION_LIKE.search(t): return "ask_llm", {"query": raw_text.strip()}, 0.75
-    m3 = re.search(r"\b(search|find|google)\b\s+(.+)$", t, re.I)
+    m3 = _FALLBACK_SEARCH.search(t)
     if m3: return "search_web", {"query": m3.group(2).strip()}, 0.65
     return None, {}, 0.0
 
@@ -585,37 +2489,191 @@ DEFAULT_WORKSPACES = {
         {"action":"open_app","app":"notes"},
     ],
 }
+class WorkspaceStore:
+    """Workspaces from `path` over `defaults`, kept in memory. The file is re-read only when its
+    (mtime, size, inode) changes, so lookups cost one stat. Writes change one entry under a lock
+    file (so several NeuroOS instances don't drop each other's edits), re-reading the file first,
+    and replace the file atomically; only entries that differ from the defaults are written."""
+    def __init__(self, path: str, defaults: Dict[str, List[Dict[str, Any]]]):
+        self.path, self.defaults = path, defaults
+        self._custom: Dict[str, List[Dict[str, Any]]] = {}
+        self._sig: Optional[Tuple[int, int, int]] = None
+        self._lock = threading.Lock()
+    def _stat(self) -> Optional[Tuple[int, int, int]]:
+        try: st = os.stat(self.path)
+        except OSError: return None
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
+    def _refresh(self) -> None:
+        sig = self._stat()
+        if sig == self._sig: return
+        data: Dict[str, Any] = {}
+        if sig is not None:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f: data = json.load(f) or {}
+            except (OSError, ValueError) as e:
+                dbg(f"workspaces: can't read {self.path}: {e}; keeping the last good copy"); return
+        self._custom = {str(k).lower(): v for k, v in data.items() if isinstance(v, list)}; self._sig = sig
+    @contextmanager
+    def _file_lock(self) -> Iterator[None]:
+        Path(os.path.dirname(self.path)).mkdir(parents=True, exist_ok=True)
+        with open(self.path + ".lock", "a+b") as fh:
+            if os.name == "nt":
+                import msvcrt
+                fh.seek(0)
+                while True:
+                    try: msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1); break
+                    except OSError: pass   # LK_LOCK gives up after ~10s; keep waiting
+                try: yield
+                finally: fh.seek(0); msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+                try: yield
+                finally: fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+    def _update(self, name: str, plan: Optional[List[Dict[str, Any]]]) -> None:
+        with self._lock, self._file_lock():
+            self._refresh()   # pick up edits by other instances before writing over them
+            custom = dict(self._custom)
+            if plan is None or plan == self.defaults.get(name): custom.pop(name, None)
+            else: custom[name] = plan
+            tmp = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp, "w", encoding="utf-8") as f: json.dump(custom, f, indent=2); f.flush(); os.fsync(f.fileno())
+            os.replace(tmp, self.path)
+            self._custom, self._sig = custom, self._stat()
+
+    def get(self, name: str) -> Optional[List[Dict[str, Any]]]:
+        name = name.lower()
+        with self._lock:
+            self._refresh()
+            return self._custom.get(name) or self.defaults.get(name)
+    def names(self) -> List[str]:
+        with self._lock:
+            self._refresh()
+            return sorted(set(self.defaults) | set(self._custom))
+    def all(self) -> Dict[str, List[Dict[str, Any]]]:
+        with self._lock:
+            self._refresh()
+            return {**self.defaults, **self._custom}
+    def put(self, name: str, plan: List[Dict[str, Any]]) -> None:
+        self._update(name.lower(), plan)
+    def delete(self, name: str) -> None:
+        self._update(name.lower(), None)
+
+WORKSPACES = WorkspaceStore(WORKSPACES_FILE, DEFAULT_WORKSPACES)
 def load_workspaces() -> Dict[str, List[Dict[str, Any]]]:
-    ws = dict(DEFAULT_WORKSPACES)
-    if os.path.exists(WORKSPACES_FILE):
-        try:
-            with open(WORKSPACES_FILE,"r") as f: ws.update(json.load(f) or {})
-        except Exception: pass
-    return ws
+    return WORKSPACES.all()
 def save_workspace(name: str, app_list: Optional[List[str]] = None):
     if app_list is None: app_list = CTX.last_opened_apps[-6:] or ["vscode","terminal"]
-    ws = load_workspaces(); ws[name] = [{"action":"open_app","app":a} for a in app_list]
     try:
-        with open(WORKSPACES_FILE,"w") as f:
-            custom = {k:v for k,v in ws.items() if k not in DEFAULT_WORKSPACES or v != DEFAULT_WORKSPACES[k]}
-            json.dump(custom, f, indent=2)
+        WORKSPACES.put(name, [{"action":"open_app","app":a} for a in app_list])
         print(f"[neuroos] Saved workspace '{name}' with apps: {', '.join(app_list)}"); speak(f"Saved workspace {name}.")
     except Exception as e:
         log_ex(e)
 
+def _ws_label(step: Dict[str, Any]) -> str:
+    return str(step.get("id") or step.get("app") or step.get("url") or step.get("action"))
+def _ws_step(step: Dict[str, Any]) -> bool:
+    """One workspace step, without speech (steps run side by side)."""
+    if step.get("action") == "open_app":
+        return ADAPT.open_app(resolve_app_name(step["app"]))
+    if step.get("action") == "open_url":
+        open_url(step["url"]); return True
+    dbg(f"workspace: unknown action {step.get('action')!r}"); return False
+
+def run_workspace(plan: List[Dict[str, Any]], workers: Optional[int] = None, timeout_s: Optional[float] = None,
+                  runner: Callable[[Dict[str, Any]], bool] = _ws_step) -> Dict[str, Any]:
+    """Runs plan steps concurrently on up to `workers` threads. A step starts once the steps
+    named in its "after" (a step "id", app or url; string or list) have finished, succeeded
+    or not; an "after" cycle is broken in plan order. A step still running after its
+    "timeout" (default timeout_s) is reported as timed out and left to finish on its own.
+    Returns {"seconds": wall time, "steps": [{"label", "status", "seconds", "start"}] in plan order}."""
+    workers = workers or int(os.environ.get("NEUROOS_WS_WORKERS", "4"))
+    timeout_s = timeout_s or float(os.environ.get("NEUROOS_WS_STEP_TIMEOUT_S", "15"))
+    keys: Dict[str, int] = {}
+    for i, st in enumerate(plan):
+        for k in (st.get("id"), st.get("app"), st.get("url")):
+            if k: keys.setdefault(str(k).lower(), i)
+    deps: List[set] = []
+    for i, st in enumerate(plan):
+        after = st.get("after") or []; d = set()
+        for a in ([after] if isinstance(after, str) else after):
+            j = keys.get(str(a).lower())
+            if j is None or j == i: dbg(f"workspace: step {_ws_label(st)!r} waits on unknown step {a!r}; ignored")
+            else: d.add(j)
+        deps.append(d)
+    results: List[Optional[Dict[str, Any]]] = [None] * len(plan)
+    pending = list(range(len(plan))); running: Dict[int, float] = {}; done_q: "queue.Queue[Tuple[int, bool]]" = queue.Queue()
+    t0 = time.perf_counter()
+    def run(i: int):
+        try: ok = bool(runner(plan[i]))
+        except Exception as e: log_ex(e); ok = False
+        done_q.put((i, ok))
+    def launch(i: int):
+        pending.remove(i); running[i] = time.perf_counter()
+        threading.Thread(target=run, args=(i,), name="neuroos-ws", daemon=True).start()
+    def finish(i: int, status: str, now: float):
+        results[i] = {"label": _ws_label(plan[i]), "status": status, "seconds": now - running[i], "start": running.pop(i) - t0}
+    limit = lambda i: float(plan[i].get("timeout") or timeout_s)
+    while pending or running:
+        for i in [i for i in pending if all(results[j] is not None for j in deps[i])]:
+            if len(running) < workers: launch(i)
+        if not running:   # everything left waits on a cycle
+            i = pending[0]; dbg(f"workspace: 'after' cycle at {_ws_label(plan[i])!r}; starting it"); launch(i); continue
+        now = time.perf_counter()
+        try:
+            i, ok = done_q.get(timeout=max(0.0, min(running[k] + limit(k) for k in running) - now))
+            if i in running: finish(i, "ok" if ok else "failed", time.perf_counter())
+        except queue.Empty:
+            pass
+        now = time.perf_counter()
+        for k in [k for k in running if now - running[k] >= limit(k)]: finish(k, "timeout", now)
+    return {"seconds": time.perf_counter() - t0, "steps": results}
+
+def submit_llm(prompt: str, context: Optional[str] = None, max_new_tokens: int = 128, priority: int = 1,
+               group: Optional[str] = None, unavailable: str = "[llm] Unavailable.", spoken: Optional[str] = None) -> LLMJob:
+    """Queues a question on LLM_JOBS and returns at once; the answer is printed as it streams
+    in, followed by generation stats (or `unavailable` when nothing came back)."""
+    ahead = LLM_JOBS.waiting()
+    if ahead: print(f"[llm] Queued behind {ahead} request(s).")
+    sink = CLIENT_OUT.current()
+    if sink is not None and group: group = f"{group}@{id(sink)}"   # daemon clients don't supersede each other
+    def on_chunk(job: LLMJob, c: str):
+        print(c if job.streamed else f"\n[llm] {c}", end="", flush=True)
+    def on_progress(job: LLMJob, done: int, total: int):
+        print(f"\r[llm] Read part {done} of ~{total}…", end="", flush=True)
+    def on_done(job: LLMJob, text: Optional[str]):
+        if job.streamed or (job.parts and not text): print()
+        if job.cancelled.is_set():
+            if job.streamed: print("[llm] (superseded by a newer question)")
+            return
+        st = job.stats
+        if text and st: print("[llm] ({:.2f}s to first token, {} tokens at {:.1f} tok/s)".format(st["ttft"], st["tokens"], st["tps"]))
+        if text:
+            if spoken: speak(spoken)
+        else:
+            print(unavailable)
+            if spoken: speak("LLM unavailable.")
+    bind = lambda fn: CLIENT_OUT.within(sink, fn)   # job threads print to the client that asked
+    job = LLM_JOBS.submit(prompt, context, max_new_tokens, priority, group, bind(on_chunk), bind(on_done), bind(on_progress))
+    if sink is not None: sink.jobs.append(job)
+    return job
+
+@traced("exec_action", lambda intent, slots: {"intent": intent})
 def exec_action(intent: str, slots: Dict):
     try:
         if intent == "open_workspace":
-            ws_all = load_workspaces()
             ws = (slots.get("workspace") or CTX.last_workspace or "coding").lower()
-            plan = ws_all.get(ws)
+            plan = WORKSPACES.get(ws)
             if not plan: print(f"[neuroos] Unknown workspace: {ws}"); speak("Unknown workspace."); return
             print(f"[neuroos] Opening workspace: {ws}"); speak(f"Opening workspace {ws}"); CTX.last_workspace = ws
-            for step in plan:
-                if step["action"] == "open_app":
-                    if open_app(step["app"]): CTX.last_opened_apps.append(step["app"])
-                elif step["action"] == "open_url":
-                    open_url(step["url"]); 
+            summary = run_workspace(plan)
+            for step, r in zip(plan, summary["steps"]):
+                print("[neuroos]   {:<24} {:>7} {:6.2f}s".format(r["label"][:24], r["status"], r["seconds"]))
+                if step.get("action") == "open_app" and r["status"] == "ok": CTX.last_opened_apps.append(step["app"])   # plan order
+            ok = sum(r["status"] == "ok" for r in summary["steps"])
+            print("[neuroos] Workspace {}: {}/{} steps in {:.2f}s ({:.2f}s one after another)".format(
+                ws, ok, len(plan), summary["seconds"], sum(r["seconds"] for r in summary["steps"])))
+            if ok < len(plan): speak(f"{len(plan) - ok} of {len(plan)} steps failed.")
             return
         if intent == "save_workspace":
             save_workspace(slots.get("name") or f"ws_{int(time.time())}"); return
@@ -639,6 +2697,13 @@ def exec_action(intent: str, slots: Dict):
             body = slots.get("body","") or CTX.last_selection
             if not body: print("[neuroos] Nothing to add."); speak("Nothing to add."); return
             notes_create_or_append(slots.get("title","Quick Notes"), body); return
+        if intent == "note_history":
+            title = slots.get("title","Quick Notes"); entries = NOTE_WRITER.history(title)
+            if not entries: print(f"[neuroos] No entries for '{title}' in the notes journal."); return
+            for e in entries:
+                body = " ".join(e["body"].split())
+                print("[neuroos] {} {}{}".format(time.strftime("%a %d %b %H:%M", time.localtime(e["ts"])), body[:100], "…" if len(body) > 100 else ""))
+            return
         if intent == "send_selection_to":
             dest = slots.get("dest","notes")
             sel = copy_selection(); CTX.last_selection = sel
@@ -664,11 +2729,22 @@ def exec_action(intent: str, slots: Dict):
             mail_draft(slots.get("to"), slots.get("subject","Note"), sel); return
         if intent == "remind":
             msg = slots.get("message","Reminder")
-            if slots.get("at"): print(f"[neuroos] Reminder at {slots['at']}: {msg}"); reminders_add(msg, at_hhmm=slots["at"])
+            if slots.get("every"): reminders_add(msg, at_hhmm=slots.get("at"), every_rel=slots["every"])
+            elif slots.get("at"): print(f"[neuroos] Reminder at {slots['at']}: {msg}"); reminders_add(msg, at_hhmm=slots["at"])
             elif slots.get("rel"):
                 unit, n = slots["rel"]; print(f"[neuroos] Reminder in {n} {unit}: {msg}"); reminders_add(msg, delta_rel=slots["rel"])
             else: print("[neuroos] Reminder (no time)"); reminders_add(msg)
             return
+        if intent == "reminders_list": reminders_list(); return
+        if intent == "reminder_cancel":
+            if REMINDERS.cancel(slots["id"]): print(f"[neuroos] Cancelled reminder #{slots['id']}."); speak("Reminder cancelled.")
+            else: print(f"[neuroos] No pending reminder #{slots['id']}.")
+            return
+        if intent == "reminder_snooze":
+            it = REMINDERS.snooze(slots.get("id"), _rel_seconds(slots.get("rel") or ("minutes", 10)))
+            if it: print(f"[neuroos] Snoozed #{it['id']} for {_fmt_wait(it['due'] - time.time() + 0.5)}: {it['msg']}"); speak("Snoozed.")
+            else: print("[neuroos] Nothing to snooze.")
+            return
         if intent == "play_music":  print("[neuroos] Play (best effort)"); music_play(); return
         if intent == "stop_music":  print("[neuroos] Pause (best effort)"); music_pause(); return
         if intent == "open_file":
@@ -685,51 +2761,321 @@ def exec_action(intent: str, slots: Dict):
         if intent == "ask_llm":
             q = slots.get("query","").strip()
             if not q: print("[neuroos] Empty question."); return
-            ans = LLM.answer(q)
-            if ans: print(f"[llm] {ans}"); speak("Answered.")
-            else:   print("[llm] Unavailable (install transformers+torch or set NEUROOS_HF_MODEL)."); speak("LLM unavailable.")
+            submit_llm(q, priority=0, group="ask", spoken="Answered.",
+                       unavailable="[llm] Unavailable (install transformers+torch or set NEUROOS_HF_MODEL).")
             return
         if intent == "explain_selection":
             sel = copy_selection() or CTX.last_selection
             if not sel.strip(): print("[neuroos] No selection captured."); speak("No selection captured."); return
-            ans = LLM.answer("Explain in simple terms.", context=sel, max_new_tokens=200)
-            if ans: print(f"[llm] {ans}"); return
-            print("[llm] Unavailable."); return
+            submit_llm("Explain in simple terms.", context=sel, max_new_tokens=200, group="selection"); return
         if intent == "summarize_selection":
             sel = copy_selection() or CTX.last_selection
             if not sel.strip(): print("[neuroos] No selection captured."); speak("No selection captured."); return
-            ans = LLM.answer("Summarize the context in 3 bullet points.", context=sel, max_new_tokens=160)
-            if ans: print(f"[llm] {ans}"); return
-            print("[llm] Unavailable."); return
+            submit_llm("Summarize the context in 3 bullet points.", context=sel, max_new_tokens=160, group="selection"); return
         if intent == "voice_devices": VOICE.list_devices(); return
         if intent == "voice_test": VOICE.test_record(); return
         if intent == "voice_start": VOICE.start(slots.get("target")); return
         if intent == "voice_stop":  VOICE.stop(); return
         if intent == "voice_status": print(VOICE.status()); return
-        if intent == "llm_status": print(LLM.status()); return
+        if intent == "llm_status": print(LLM.status()); print(LLM_JOBS.status()); return
+        if intent == "trace":
+            mode = slots.get("mode", "dump")
+            if mode in ("on", "off"):
+                TRACE.enable(mode == "on")
+                print(f"[trace] {mode}" + (f"; spans go to {TRACE.path}" if mode == "on" else "")); return
+            rows = TRACE.summary()
+            if not rows: print("[trace] No spans recorded (turn tracing on with: trace on)."); return
+            path = os.path.join(DATA_DIR, "traces", time.strftime("trace-%Y%m%d-%H%M%S.json"))
+            n = TRACE.dump(path)
+            for name, count, total, longest in rows:
+                print("[trace] {:<28} {:6d}x {:10.2f} ms total {:9.2f} ms max".format(name[:28], count, total, longest))
+            print(f"[trace] Wrote {n} spans to {path} (open in chrome://tracing or ui.perfetto.dev)"); return
+        if intent == "metrics":
+            for line in METRICS.summary_lines(): print(f"[metrics] {line}")
+            return
         print("[neuroos] I don't know how to do that yet."); speak("I don't know how to do that yet.")
     except Exception as e:
-        log_ex(e); print("[neuroos] (handled error)")
+        METRICS.inc("neuroos_command_errors_total"); log_ex(e); print("[neuroos] (handled error)")
 
 # --------- Voice engine (improved) ----------
+@lru_cache(maxsize=8)
+def _polyphase_filter(sr_in: int, sr_out: int, zeros: int = 16, rolloff: float = 0.94, beta: float = 8.6):
+    """Kaiser-windowed sinc for sr_in -> sr_out laid out as one frame matrix: every L outputs
+    consume exactly M inputs, so a frame of M + 2*off + 1 inputs times B (columns = the L
+    output phases) gives L outputs with a single matmul. Returns (L, M, off, B)."""
+    import math
+    import numpy as np
+    g = math.gcd(sr_in, sr_out); L, M = sr_out // g, sr_in // g
+    fc = 0.5 * min(1.0, L / M) * rolloff          # cutoff in cycles per input sample
+    half = zeros / (2 * fc)                         # filter half-width in input samples
+    off = int(math.ceil(half))
+    tau = (np.arange(L) * M / L)[None, :] - (np.arange(M + 2 * off + 1) - off)[:, None]
+    h = 2 * fc * np.sinc(2 * fc * tau) * np.i0(beta * np.sqrt(np.clip(1 - (tau / half) ** 2, 0, 1))) / np.i0(beta)
+    h[np.abs(tau) >= half] = 0
+    h /= h.sum(axis=0, keepdims=True)               # unity DC gain for every phase
+    return L, M, off, np.ascontiguousarray(h, dtype=np.float32)
+
+class Resampler:
+    """Streaming polyphase resampler (filters cached per rate pair). process() takes blocks
+    of any size and returns the output available so far, delayed by the filter half-width;
+    final=True drains it. The returned array is reused by the next call."""
+    def __init__(self, sr_in: int, sr_out: int = 16000):
+        import numpy as np
+        self.sr_in, self.sr_out = sr_in, sr_out
+        self.L, self.M, self.off, self.B = _polyphase_filter(sr_in, sr_out)
+        self.win = self.B.shape[0]
+        self._buf = np.zeros(self.win + 4096, dtype=np.float32); self._n = self.off   # left history starts as silence
+        self._y = np.zeros(self.L * 8, dtype=np.float32)
+        self.n_in = 0; self.n_out = 0
+    def _push(self, x) -> None:
+        import numpy as np
+        need = self._n + len(x)
+        if need > len(self._buf):
+            buf = np.zeros(max(need, 2 * len(self._buf)), dtype=np.float32); buf[:self._n] = self._buf[:self._n]; self._buf = buf
+        self._buf[self._n:need] = x; self._n = need
+    def process(self, x, final: bool = False):
+        import numpy as np
+        from numpy.lib.stride_tricks import sliding_window_view
+        self._push(x); self.n_in += len(x)
+        if final: self._push(np.zeros(self.off + self.M, dtype=np.float32))
+        frames = (self._n - self.win) // self.M + 1 if self._n >= self.win else 0
+        n = frames * self.L
+        if len(self._y) < n: self._y = np.zeros(n, dtype=np.float32)
+        y = self._y[:n]
+        if frames:
+            np.matmul(sliding_window_view(self._buf[:self._n], self.win)[::self.M][:frames], self.B, out=y.reshape(frames, self.L))
+            used = frames * self.M; rest = self._n - used
+            self._buf[:rest] = self._buf[used:self._n]; self._n = rest
+        if final:   # outputs at t = k*M/L for every t < n_in, nothing from the padding
+            y = y[:max(0, -(-self.n_in * self.L // self.M) - self.n_out)]
+        self.n_out += len(y)
+        return y
+    def process_i16(self, x, final: bool = False):
+        """process() rounded and clipped to the int16 range (still float32, ready to store)."""
+        import numpy as np
+        y = self.process(x, final)
+        np.rint(y, out=y); np.clip(y, -32768, 32767, out=y)
+        return y
+
+# --------- speech detectors (VAD) ----------
+class SpeechDetector:
+    """Per-block speech/non-speech decision on int16 frames (10-30 ms). classify() takes a
+    2-D array of frames (file input) and may vectorize; detectors can keep state."""
+    name = "base"
+    def __init__(self, sr: int): self.sr = sr
+    def is_speech(self, frame) -> bool: raise NotImplementedError
+    def classify(self, frames) -> List[bool]:
+        return [self.is_speech(f) for f in frames]
+
+class WebrtcVad(SpeechDetector):
+    name = "webrtc"
+    def __init__(self, sr: int):
+        import webrtcvad
+        if sr not in (8000, 16000, 32000, 48000): raise ValueError("webrtcvad does not support {} Hz".format(sr))
+        super().__init__(sr)
+        self.vad = webrtcvad.Vad(int(os.environ.get("NEUROOS_VAD_MODE", "2")))
+    def is_speech(self, frame) -> bool:
+        try: return self.vad.is_speech(frame.view("uint8"), self.sr)
+        except Exception: return False
+
+class EnergyVad(SpeechDetector):
+    """Frame energy against an adaptive noise floor: the floor follows quiet frames quickly
+    and creeps up under sustained sound, so fan or street noise stops reading as speech."""
+    name = "energy"
+    margin_db = 10.0   # above the floor
+    min_db = 30.0      # absolute gate (rms ~30)
+    def __init__(self, sr: int):
+        import numpy as np
+        super().__init__(sr)
+        self.floor = 40.0
+        self._f32 = np.zeros(sr // 10, dtype=np.float32)   # reused for every block
+    def _decide(self, e_db: float, voiced: bool = True) -> bool:
+        speech = voiced and e_db > self.min_db and e_db > self.floor + self.margin_db
+        rate = 0.002 if speech else (0.3 if e_db < self.floor else 0.05)
+        self.floor += (e_db - self.floor) * rate
+        return speech
+    def _energy_db(self, frame) -> float:
+        import numpy as np
+        f = self._f32[:len(frame)]; f[...] = frame
+        return 10 * math.log10(float(np.dot(f, f)) / max(1, len(f)) + 1.0)
+    def is_speech(self, frame) -> bool:
+        return self._decide(self._energy_db(frame))
+    def classify(self, frames) -> List[bool]:
+        import numpy as np
+        f = np.asarray(frames, dtype=np.float32)
+        e_db = 10 * np.log10(np.einsum("ij,ij->i", f, f) / max(1, f.shape[1]) + 1.0)
+        return [self._decide(float(e)) for e in e_db]
+
+class SpectralVad(EnergyVad):
+    """Energy gate plus two cheap spectral cues: most power in the 80-3500 Hz voice band
+    and a peaky (non-flat) spectrum, which rejects broadband noise and mains hum."""
+    name = "spectral"
+    margin_db = 6.0
+    def __init__(self, sr: int):
+        super().__init__(sr)
+        self._win: Dict[int, Any] = {}
+    def _voiced(self, frames) -> List[bool]:
+        import numpy as np
+        n = frames.shape[1]
+        if n not in self._win:
+            freqs = np.fft.rfftfreq(n, 1 / self.sr)
+            self._win[n] = (np.hanning(n).astype(np.float32), (freqs >= 80) & (freqs <= 3500), (freqs >= 80) & (freqs <= 4000))
+        win, band, flat_band = self._win[n]
+        p = np.abs(np.fft.rfft(frames * win, axis=1)) ** 2 + 1e-3
+        ratio = p[:, band].sum(axis=1) / p.sum(axis=1)
+        q = p[:, flat_band]
+        flatness = np.exp(np.log(q).mean(axis=1)) / q.mean(axis=1)
+        return list((ratio > 0.55) & (flatness < 0.35))
+    def is_speech(self, frame) -> bool:
+        e_db = self._energy_db(frame)
+        return self._decide(e_db, e_db > self.min_db and self._voiced(self._f32[None, :len(frame)])[0])
+    def classify(self, frames) -> List[bool]:
+        import numpy as np
+        f = np.asarray(frames, dtype=np.float32)
+        e_db = 10 * np.log10(np.einsum("ij,ij->i", f, f) / max(1, f.shape[1]) + 1.0)
+        return [self._decide(float(e), bool(v)) for e, v in zip(e_db, self._voiced(f))]
+
+VAD_KINDS: Dict[str, type] = {"webrtc": WebrtcVad, "energy": EnergyVad, "spectral": SpectralVad}
+
+def make_vad(kind: str, sr: int) -> SpeechDetector:
+    """The requested detector, falling back to the energy detector (never unavailable)."""
+    for k in dict.fromkeys([kind, "energy"]):
+        try:
+            vad = VAD_KINDS[k](sr); dbg("VAD: {} at {} Hz".format(vad.name, sr)); return vad
+        except Exception as e:
+            dbg("VAD {!r} unavailable at {} Hz ({}); falling back".format(k, sr, e))
+    return EnergyVad(sr)
+
+class PcmRing:
+    """Preallocated int16 capture buffer. Each sample is stored twice (at i and i+cap), so
+    any span of up to cap samples is one contiguous slice and segments are handed out as
+    views. Positions are absolute sample counts; a view is intact while pos - start <= cap."""
+    def __init__(self, cap: int):
+        import numpy as np
+        self.cap = max(1, int(cap))
+        self.buf = np.zeros(2 * self.cap, dtype=np.int16)
+        self.pos = 0
+        self.cond = threading.Condition()
+    def write(self, block) -> int:
+        n = len(block); i = self.pos % self.cap; k = min(n, self.cap - i)
+        self.buf[i:i + n] = block                       # may run on into the mirror half
+        self.buf[i + self.cap:i + self.cap + k] = block[:k]
+        if k < n: self.buf[:n - k] = block[k:]
+        with self.cond:
+            self.pos += n; self.cond.notify_all()
+        return self.pos
+    def view(self, start: int, end: int):
+        i = start % self.cap
+        return self.buf[i:i + (end - start)]
+    def intact(self, start: int) -> bool:
+        return self.pos - start <= self.cap
+    def feed(self, pcm, block: int):
+        """Writes int16 audio block by block, yielding the end position of each (file input)."""
+        for i in range(0, len(pcm) - block + 1, block):
+            yield self.write(pcm[i:i + block])
+    def follow(self, block: int, alive: Callable[[], bool]):
+        """Yields the end position of each new block written by the capture callback."""
+        end = self.pos
+        while alive():
+            with self.cond:
+                if self.pos < end + block:
+                    self.cond.wait(0.25); continue
+            end += block
+            if not self.intact(end - block):
+                dbg("voice ring overrun; skipping ahead"); end = self.pos - self.pos % block
+                continue
+            yield end
+
+class VoiceSegment:
+    """Speech handed from the recorder to the decoder: a finished utterance, or (streaming
+    mode) the utterance so far while the user is still talking. pcm is an int16 view into
+    the recorder's PcmRing (ring/start say where), so nothing is copied until decode."""
+    def __init__(self, pcm, sr: int, seg_id: int, final: bool = True, seq: int = 0, t_audio: float = 0.0,
+                 ring: Optional[PcmRing] = None, start: int = 0):
+        self.pcm, self.sr, self.seg_id, self.final, self.seq = pcm, sr, seg_id, final, seq
+        self.ring, self.start = ring, start
+        self.t_audio = t_audio   # seconds of audio read when this was emitted
+        self.t_queued = 0.0
+        self.merged: List["VoiceSegment"] = []   # later finals folded into this queue slot
+    def seconds(self) -> float:
+        return (len(self.pcm) / self.sr) + sum(m.seconds() for m in self.merged)
+    def intact(self) -> bool:
+        """False once the recorder has wrapped around and overwritten this audio."""
+        return self.ring is None or self.ring.intact(self.start)
+
+class PartialTranscript:
+    """Stabilizes successive hypotheses of one growing segment: the word prefix on which
+    two consecutive hypotheses agree is committed and never taken back."""
+    def __init__(self):
+        self.committed: List[str] = []
+        self._prev: List[str] = []
+    @staticmethod
+    def key(w: str) -> str:
+        return re.sub(r"[^\w']", "", w.lower())
+    def update(self, text: str) -> Tuple[str, str]:
+        """Feeds one hypothesis; returns (committed text, unstable tail)."""
+        words = text.split(); n = 0
+        for a, b in zip(self._prev, words):
+            if self.key(a) != self.key(b): break
+            n += 1
+        if n > len(self.committed): self.committed = words[:n]
+        self._prev = words
+        return " ".join(self.committed), " ".join(words[len(self.committed):])
+
+# intents safe to run from a stable partial transcript, before the utterance has ended
+EARLY_INTENTS = {"open_app", "open_workspace", "open_url", "play_music", "stop_music", "voice_stop", "voice_status", "llm_status"}
+LEADING_CHAIN = re.compile(r"^\s*(?:;|&&|and then|then|and|also)\b\s*", re.I)
+
 class VoiceEngine:
     def __init__(self):
         self.running = False
         self.rec_thread: Optional[threading.Thread] = None
-        self.dec_thread: Optional[threading.Thread] = None
+        self.dec_threads: List[threading.Thread] = []
         self.consume_thread: Optional[threading.Thread] = None
-        self.seg_q: "queue.Queue[Tuple[bytes,int]]" = queue.Queue()  # (pcm16, sr)
-        self.txt_q: "queue.Queue[str]" = queue.Queue()
+        # decoder pool: one WhisperModel per worker; seg_q is bounded, overflow is merged or dropped
+        self.n_decoders = max(1, int(os.environ.get("NEUROOS_VOICE_DECODERS", "1")))
+        self.batch_max = max(1, int(os.environ.get("NEUROOS_VOICE_BATCH", "4")))
+        self.queue_policy = os.environ.get("NEUROOS_VOICE_QUEUE_POLICY", "merge")   # merge | drop
+        self.seg_q: "queue.Queue[VoiceSegment]" = queue.Queue(maxsize=max(1, int(os.environ.get("NEUROOS_VOICE_QUEUE", "8"))))
+        self.txt_q: "queue.Queue[Tuple[int,str,str,bool]]" = queue.Queue()  # (seg_id, text, unstable tail, final)
         self.err: Optional[str] = None
         self.model = None
+        self.models: List[Any] = []
         self.input_device_index: Optional[int] = None
         self.input_device_name: Optional[str] = None
         self.stream_sr: int = 16000  # will adapt if needed
+        self.ring_s = float(os.environ.get("NEUROOS_VOICE_RING_S", "60"))   # seconds of audio kept for queued segments
+        self._tls = threading.local()   # per-decoder float32 scratch buffer
+        self._starting = False
+        # segmentation: detector (webrtc | energy | spectral) and timing
+        self.vad_kind = os.environ.get("NEUROOS_VAD", "webrtc")
+        self.preroll_ms = int(os.environ.get("NEUROOS_VAD_PREROLL_MS", "200"))      # kept before the first speech block
+        self.hangover_ms = int(os.environ.get("NEUROOS_VAD_HANGOVER_MS", "300"))    # kept after the last one
+        self.silence_end_ms = int(os.environ.get("NEUROOS_VAD_SILENCE_MS", "700"))  # silence that closes a segment
+        self.max_segment_ms = int(os.environ.get("NEUROOS_VAD_MAX_SEGMENT_MS", "12000"))
+        # streaming: decode the growing utterance every stream_step_ms and act on stable prefixes
+        self.stream = os.environ.get("NEUROOS_VOICE_STREAM", "0") == "1"
+        self.stream_step_ms = int(os.environ.get("NEUROOS_VOICE_STREAM_STEP_MS", "600"))
+        self._live: Tuple[int, int] = (-1, 0)        # (seg_id, seq) of the newest partial still worth decoding
+        self._partials: Dict[int, PartialTranscript] = {}
+        self._fired: Dict[int, str] = {}             # seg_id -> command already run from a partial
+        self._seg_ids = count()                      # never reused, so nothing from an earlier session matches
+        # finals are handed to process_line in recording order, whichever worker finishes first
+        self._order: "deque[int]" = deque(); self._order_lock = threading.Lock()
+        self._results: Dict[int, str] = {}
+        self._timings: "deque[Tuple[float, float]]" = deque(maxlen=50)   # (queue wait s, decode s) per segment
+        self.n_dropped = 0; self.n_merged = 0
 
     def status(self) -> str:
-        return "[voice] running={} device={} sr={} seg_q={} txt_q={} error={}".format(
-            self.running, self.input_device_name or self.input_device_index, self.stream_sr,
-            self.seg_q.qsize(), self.txt_q.qsize(), self.err or "none"
+        t = list(self._timings)
+        timing = "wait={:.0f}/{:.0f}ms decode={:.0f}/{:.0f}ms (last/avg of {})".format(
+            t[-1][0]*1000, sum(w for w, _ in t)/len(t)*1000, t[-1][1]*1000, sum(d for _, d in t)/len(t)*1000, len(t)
+        ) if t else "wait=- decode=-"
+        return "[voice] running={} device={} sr={} vad={} stream={} decoders={} seg_q={}/{} txt_q={} {} dropped={} merged={} whisper=({}) error={}".format(
+            self.running, self.input_device_name or self.input_device_index, self.stream_sr, self.vad_kind,
+            "on/{}ms".format(self.stream_step_ms) if self.stream else "off", self.n_decoders,
+            self.seg_q.qsize(), self.seg_q.maxsize, self.txt_q.qsize(), timing, self.n_dropped, self.n_merged,
+            MODELS.describe("whisper"), self.err or "none"
         )
 
     # ---- utilities ----
@@ -819,19 +3165,12 @@ class VoiceEngine:
             if DEBUG: traceback.print_exc()
 
     # ---- resample to 16k for Whisper ----
-    def _resample_to_16k(self, pcm_i16: bytes, sr_in: int) -> bytes:
+    def _resample_to_16k(self, pcm_i16, sr_in: int):
+        """Whole-segment resample (the recorder already streams 16 kHz; this covers other sources)."""
         import numpy as np
         if sr_in == 16000:
             return pcm_i16
-        arr = np.frombuffer(pcm_i16, dtype=np.int16).astype(np.float32)
-        x = np.arange(len(arr))
-        duration = len(arr) / sr_in
-        n_out = int(duration * 16000)
-        if n_out <= 0: return pcm_i16
-        x_out = np.linspace(0, len(arr)-1, n_out)
-        y = np.interp(x_out, x, arr)
-        y16 = np.clip(y, -32768, 32767).astype(np.int16)
-        return y16.tobytes()
+        return Resampler(sr_in).process_i16(np.frombuffer(pcm_i16, dtype=np.int16), final=True).astype(np.int16)
 
     def start(self, target: Optional[str] = None):
         if self.running:
@@ -845,16 +3184,37 @@ class VoiceEngine:
             from faster_whisper import WhisperModel  # noqa
         except Exception:
             print("[voice] Missing faster-whisper. Install: pip install faster-whisper"); return
-
-        # load model
+        if self._starting:
+            print("[voice] already starting (Whisper is loading)."); return
+        if MODELS.state("whisper") != "ready":
+            # don't hold the REPL while Whisper loads; listening starts when it is resident
+            print("[voice] loading Whisper in the background; listening starts when it is ready.")
+            self._starting = True
+            threading.Thread(target=self._start, args=(target,), daemon=True).start(); return
+        self._start(target)
+
+    def _load_models(self) -> List[Any]:
+        """Loader for MODELS["whisper"]: one model per decoder worker, splitting the CPU threads."""
+        from faster_whisper import WhisperModel
         model_size = os.environ.get("NEUROOS_WHISPER_PATH") or os.environ.get("NEUROOS_WHISPER_SIZE", "small.en")
         compute = os.environ.get("NEUROOS_WHISPER_COMPUTE", "int8")
+        threads = max(1, (os.cpu_count() or 2) // self.n_decoders) if self.n_decoders > 1 else 0
+        return [WhisperModel(model_size, device="cpu", compute_type=compute, cpu_threads=threads) for _ in range(self.n_decoders)]
+
+    def _start(self, target: Optional[str]) -> None:
         try:
-            from faster_whisper import WhisperModel
-            self.model = WhisperModel(model_size, device="cpu", compute_type=compute)
-        except Exception as e:
-            self.err = "whisper load failed: {}".format(e); log_ex(e)
+            self._open(target)
+        finally:
+            self._starting = False
+
+    def _open(self, target: Optional[str]) -> None:
+        background = self._starting
+        models = MODELS.get("whisper", retry=True)   # `voice start` is an explicit request: retry a failed load
+        if background and not self._starting: return   # voice off while loading
+        if not models:
+            self.err = "whisper load failed: {}".format(MODELS.error("whisper"))
             print("[voice] Could not load Whisper. Try: export NEUROOS_WHISPER_SIZE=tiny.en"); return
+        self.models = models; self.model = models[0]
 
         # pick input device
         idx, name = self._find_device(target)
@@ -880,112 +3240,306 @@ class VoiceEngine:
         print("[voice] using device '{}' (index {}) at {} Hz".format(name, idx, chosen_sr))
 
         # threads
+        self._reset_session()
         self.running = True; self.err = None
+        MODELS.pin("whisper")   # resident while listening; the idle TTL starts at voice stop
         self.rec_thread = threading.Thread(target=self._recorder, daemon=True)
-        self.dec_thread = threading.Thread(target=self._decoder, daemon=True)
+        self.dec_threads = [threading.Thread(target=self._decoder, args=(i,), daemon=True) for i in range(len(self.models))]
         self.consume_thread = threading.Thread(target=self._consumer, daemon=True)
-        self.rec_thread.start(); self.dec_thread.start(); self.consume_thread.start()
+        self.rec_thread.start(); self.consume_thread.start()
+        for t in self.dec_threads: t.start()
         print("[voice] started."); speak("Voice started.")
 
+    def _reset_session(self) -> None:
+        """Drops what a stopped session left behind: queued segments and transcripts, and the
+        ordering state a pending final would otherwise hold up every later one with."""
+        for q in (self.seg_q, self.txt_q):
+            while True:
+                try: q.get_nowait()
+                except queue.Empty: break
+        with self._order_lock: self._order.clear()
+        self._results.clear(); self._fired.clear(); self._partials.clear(); self._live = (-1, 0)
+
     def stop(self):
         if not self.running:
+            if self._starting:
+                self._starting = False; print("[voice] start cancelled."); return
             print("[voice] already stopped."); return
         self.running = False
+        MODELS.unpin("whisper"); self.models = []; self.model = None   # decoders drop theirs as they exit
         print("[voice] stopping…"); speak("Voice stopped.")
 
+    def _make_vad(self, sr: int) -> SpeechDetector:
+        return make_vad(self.vad_kind, sr)
+
+    def _segments(self, blocks, sr: int, block_size: int, vad: SpeechDetector, ring: PcmRing):
+        """Turns 20 ms blocks of int16 PCM into VoiceSegments. blocks yields the end position
+        of each block already written to ring; segments are views into it, from preroll_ms
+        before the first speech block to hangover_ms after the last. With streaming on, the
+        utterance so far is also emitted every stream_step_ms as a non-final segment."""
+        block_ms = 20
+        preroll, hangover = sr * self.preroll_ms // 1000, sr * self.hangover_ms // 1000
+        step = int(sr * self.stream_step_ms / 1000)
+        collecting = False
+        start = 0; onset = 0; voiced_to = 0; prev_end = 0; speech_ms=0; silence_ms=0
+        seg_id = next(self._seg_ids); seq = 0; last_partial = 0; read_ms = 0
+        for end in blocks:
+            read_ms += block_ms
+            if vad.is_speech(ring.view(end - block_size, end)):
+                if not collecting:
+                    onset = end - block_size; start = max(onset - preroll, prev_end, end - ring.cap // 2)
+                speech_ms += block_ms; silence_ms = 0; collecting = True; voiced_to = end
+            else:
+                if collecting:
+                    silence_ms += block_ms
+
+            n = end - start
+            if collecting and (silence_ms >= self.silence_end_ms or speech_ms >= self.max_segment_ms or n >= ring.cap // 2):
+                self._live = (seg_id, -1)   # pending partials of this segment are stale now
+                stop = prev_end = min(end, voiced_to + hangover)
+                if (end - onset) * 2 > block_size * 5:
+                    yield VoiceSegment(ring.view(start, stop), sr, seg_id, final=True, t_audio=read_ms/1000, ring=ring, start=start)
+                    dbg("segment queued (~{:.2f}s)".format((stop - start)/sr))
+                collecting=False; speech_ms=0; silence_ms=0
+                seg_id = next(self._seg_ids); seq = 0; last_partial = 0
+            elif collecting and self.stream and silence_ms == 0 and n - last_partial >= step:
+                seq += 1; last_partial = n; self._live = (seg_id, seq)
+                yield VoiceSegment(ring.view(start, end), sr, seg_id, final=False, seq=seq, t_audio=read_ms/1000, ring=ring, start=start)
+
+    def segment_pcm(self, pcm, sr: int) -> List[VoiceSegment]:
+        """Offline segmentation of a whole recording (file input, benchmarks): the same
+        detector and segmenter as the live recorder, finals only, 16 kHz views."""
+        import numpy as np
+        pcm = np.frombuffer(pcm, dtype=np.int16)
+        if sr != 16000: pcm = self._resample_to_16k(pcm, sr); sr = 16000
+        bs = sr // 50
+        pcm = np.concatenate([pcm, np.zeros(sr * (self.silence_end_ms + 40) // 1000, dtype=np.int16)])   # let a trailing utterance close
+        ring = PcmRing(len(pcm) + bs)
+        decided = iter(self._make_vad(sr).classify(pcm[:len(pcm) // bs * bs].reshape(-1, bs)))   # whole file at once
+        gate = SpeechDetector(sr); gate.is_speech = lambda frame: next(decided)
+        return [it for it in self._segments(ring.feed(pcm, bs), sr, bs, gate, ring) if it.final]
+
     def _recorder(self):
         try:
-            import sounddevice as sd, numpy as np
-            # VAD
-            vad = None; use_vad = False
-            try:
-                import webrtcvad
-                # VAD supports 8000/16000/32000/48000
-                if self.stream_sr in (8000,16000,32000,48000):
-                    vad = webrtcvad.Vad(2); use_vad = True; dbg("using webrtcvad at {} Hz".format(self.stream_sr))
-                else:
-                    dbg("VAD disabled (sr={} not supported)".format(self.stream_sr))
-            except Exception:
-                dbg("webrtcvad unavailable; using RMS threshold")
+            import numpy as np
+            import sounddevice as sd
 
             block_ms = 20
             block_size = int(self.stream_sr * block_ms / 1000)
-
-            def is_speech(frame_i16: bytes) -> bool:
-                if use_vad:
-                    try: return vad.is_speech(frame_i16, self.stream_sr)
-                    except Exception: return False
-                arr = np.frombuffer(frame_i16, dtype=np.int16)
-                rms = float(np.sqrt(np.mean(arr.astype(np.float32)**2)) + 1e-8)
-                return rms > 200  # lowered threshold
-
-            max_segment_ms = 12000
-            silence_end_ms = 700
-
-            with sd.RawInputStream(samplerate=self.stream_sr, blocksize=block_size, dtype='int16', channels=1, device=self.input_device_index) as istream:
+            # the ring (and VAD, segments, decoders) run at 16 kHz; other mic rates are resampled per block
+            sr = 16000
+            rs = Resampler(self.stream_sr, sr) if self.stream_sr != sr else None
+            vad = self._make_vad(sr)
+            ring = PcmRing(int(sr * self.ring_s))
+
+            def on_audio(indata, frames, t, status):
+                # PortAudio's buffer goes straight into the ring; no per-block allocation at 16 kHz
+                if status.input_overflow and DEBUG: dbg("input overflow")
+                pcm = np.frombuffer(indata, dtype=np.int16)
+                ring.write(rs.process_i16(pcm) if rs else pcm)
+
+            with sd.RawInputStream(samplerate=self.stream_sr, blocksize=block_size, dtype='int16', channels=1,
+                                   device=self.input_device_index, callback=on_audio):
                 print("[voice] Listening… (say: 'open chrome', 'what is a mutex?')")
-                collecting = False
-                seg = bytearray(); speech_ms=0; silence_ms=0
-
-                while self.running:
-                    data, overflowed = istream.read(block_size)
-                    if overflowed and DEBUG: dbg("input overflow")
-                    if not data: continue
-
-                    if is_speech(data):
-                        seg.extend(data); speech_ms += block_ms; silence_ms = 0; collecting = True
-                    else:
-                        if collecting:
-                            silence_ms += block_ms; seg.extend(data)
-
-                    if collecting and (silence_ms >= silence_end_ms or speech_ms >= max_segment_ms):
-                        if len(seg) > block_size * 5:
-                            # enqueue (pcm, sr)
-                            self.seg_q.put((bytes(seg), self.stream_sr))
-                            dbg("segment queued (~{:.2f}s)".format(len(seg)/2/self.stream_sr))
-                        seg = bytearray(); collecting=False; speech_ms=0; silence_ms=0
+                blocks = ring.follow(sr * block_ms // 1000, lambda: self.running)
+                for item in self._segments(blocks, sr, sr * block_ms // 1000, vad, ring):
+                    self._enqueue(item)
         except Exception as e:
             self.err = str(e); log_ex(e)
             print("[voice] recorder error:", e)
 
-    def _decoder(self):
+    def _enqueue(self, item: VoiceSegment) -> None:
+        """Bounded put. On overflow a partial is dropped (a newer one follows); a final is
+        merged into the newest queued final ("merge") or replaces the oldest item ("drop")."""
+        item.t_queued = time.time()
+        if item.final:
+            with self._order_lock: self._order.append(item.seg_id)
+            TRACE.add("voice.record", item.t_queued - item.seconds(), item.seconds(), seg=item.seg_id)
+            METRICS.observe("neuroos_voice_queue_depth", self.seg_q.qsize())
         try:
-            import numpy as np
-            from faster_whisper import WhisperModel
-            model: WhisperModel = self.model  # type: ignore
+            self.seg_q.put_nowait(item); return
+        except queue.Full:
+            pass
+        if not item.final:
+            self.n_dropped += 1; return
+        with self.seg_q.mutex:
+            q = self.seg_q.queue
+            tail = next((it for it in reversed(q) if it.final), None)
+            if self.queue_policy == "merge" and tail is not None and tail.seconds() + item.seconds() <= 30:
+                tail.merged.append(item); self.n_merged += 1; return
+            old = q.popleft(); q.append(item); self.n_dropped += 1
+        dbg("seg_q full: dropped segment {}".format(old.seg_id))
+        for it in ([old] + old.merged if old.final else []):
+            self.txt_q.put((it.seg_id, "", "", True))   # keep the consumer's ordering moving
+
+    def _scratch(self, n: int):
+        """This decoder thread's float32 buffer, grown only when a longer clip shows up."""
+        import numpy as np
+        buf = getattr(self._tls, "f32", None)
+        if buf is None or len(buf) < n:
+            buf = self._tls.f32 = np.empty(max(n, 16000 * 32), dtype=np.float32)
+        return buf
+
+    def _pcm_f32(self, pcm, sr_in: int, out=None):
+        import numpy as np
+        # resample to 16k if needed
+        if sr_in != 16000:
+            pcm = self._resample_to_16k(pcm, sr_in)
+        out = (self._scratch(len(pcm)) if out is None else out)[:len(pcm)]
+        out[...] = pcm; out *= np.float32(1 / 32768.0)   # a mixed-type multiply would allocate cast buffers
+        return out
+
+    def _audio(self, item: VoiceSegment, out=None):
+        """Segment audio as float32 in a reused buffer; None if the ring overwrote it first."""
+        audio = self._pcm_f32(item.pcm, item.sr, out)
+        if item.intact(): return audio
+        self.n_dropped += 1; dbg("segment {} overwritten before decode; dropped".format(item.seg_id))
+        return None
+
+    def _transcribe(self, audio, model=None) -> str:
+        if audio is None: return ""
+        segments, info = (model or self.model).transcribe(audio, language="en", task="transcribe", beam_size=1, vad_filter=False)
+        return "".join(seg.text for seg in segments).strip()
+
+    def _transcribe_batch(self, items: List[VoiceSegment], model, pipe) -> List[str]:
+        """Several finished segments in one batched call when the backend supports it:
+        the clips are laid out on one timeline and results mapped back by start time."""
+        if pipe is None or len(items) == 1:
+            return [self._transcribe(self._audio(it), model) for it in items]
+        from bisect import bisect_right
+        gap = 8000
+        buf = self._scratch(sum(len(it.pcm) * 16000 // it.sr + 1 + gap for it in items))
+        clips, owners, pos = [], [], 0
+        for i, it in enumerate(items):
+            a = self._audio(it, buf[pos:])
+            if a is None: continue
+            clips.append({"start": pos / 16000, "end": (pos + len(a)) / 16000}); owners.append(i)
+            pos += len(a); buf[pos:pos + gap] = 0; pos += gap
+        starts = [c["start"] for c in clips]; texts = [""] * len(items)
+        if not clips: return texts
+        try:
+            segments, info = pipe.transcribe(buf[:pos], language="en", task="transcribe", beam_size=1,
+                                             vad_filter=False, clip_timestamps=clips, batch_size=len(clips))
+            for seg in segments:
+                texts[owners[max(0, bisect_right(starts, seg.start + 1e-3) - 1)]] += seg.text
+        except Exception as e:
+            dbg("batched decode failed ({}); decoding one by one".format(e))
+            return [self._transcribe(self._audio(items[i]), model) if i in owners else "" for i in range(len(items))]
+        return [t.strip() for t in texts]
+
+    @traced("voice.decode", lambda self, items, *a: {"segments": len(items), "finals": sum(it.final for it in items)})
+    def _decode_items(self, items: List[VoiceSegment], model=None, pipe=None) -> None:
+        finals: List[VoiceSegment] = []
+        for item in items:
+            if item.final:
+                finals += [item] + item.merged
+            elif (item.seg_id, item.seq) == self._live:   # otherwise a newer partial or the final is queued
+                t0 = time.time(); audio = self._audio(item)
+                if audio is None: continue
+                text = self._transcribe(audio, model)
+                self._timings.append((t0 - item.t_queued, time.time() - t0))
+                committed, tail = self._partials.setdefault(item.seg_id, PartialTranscript()).update(text)
+                if committed or tail: self.txt_q.put((item.seg_id, committed, tail, False)); dbg("partial: {} | {}".format(committed, tail))
+        if not finals: return
+        t0 = time.time()
+        try:
+            texts = self._transcribe_batch(finals, model, pipe)
+        except Exception as e:
+            dbg("decode err: {}".format(e)); texts = [""] * len(finals)
+        took = time.time() - t0; audio_s = sum(it.seconds() for it in finals)
+        METRICS.observe("neuroos_voice_decode_seconds", took)
+        if audio_s > 0: METRICS.observe("neuroos_voice_rtf", took / audio_s)
+        for item, text in zip(finals, texts):
+            self._timings.append((t0 - (item.t_queued or t0), took))
+            self._partials.pop(item.seg_id, None)
+            self.txt_q.put((item.seg_id, text, "", True))
+            if text: dbg("decoded: {}".format(text))
+
+    def _decode_item(self, item: VoiceSegment) -> None:
+        self._decode_items([item], self.model, None)
+
+    def _decoder(self, idx: int = 0):
+        try:
+            model = self.models[idx] if self.models else self.model
+            pipe = None
+            if self.batch_max > 1:
+                try:
+                    from faster_whisper import BatchedInferencePipeline
+                    pipe = BatchedInferencePipeline(model=model)
+                except Exception:
+                    dbg("batched whisper pipeline unavailable; decoding segments one by one")
             while self.running:
                 try:
-                    pcm, sr_in = self.seg_q.get(timeout=0.25)
+                    batch = [self.seg_q.get(timeout=0.25)]
                 except queue.Empty:
                     continue
+                while len(batch) < self.batch_max:
+                    try: batch.append(self.seg_q.get_nowait())
+                    except queue.Empty: break
                 try:
-                    # resample to 16k if needed
-                    if sr_in != 16000:
-                        pcm = self._resample_to_16k(pcm, sr_in)
-                        sr_in = 16000
-                    arr = np.frombuffer(pcm, dtype=np.int16).astype(np.float32)/32768.0
-                    segments, info = model.transcribe(arr, language="en", task="transcribe", beam_size=1, vad_filter=False)
-                    text = "".join(seg.text for seg in segments).strip()
-                    if text:
-                        self.txt_q.put(text); dbg("decoded: {}".format(text))
+                    self._decode_items(batch, model, pipe)
                 except Exception as e:
                     dbg("decode err: {}".format(e))
         except Exception as e:
             self.err = str(e); log_ex(e)
 
+    def _early_intent(self, committed: str, tail: str) -> bool:
+        """True when a partial transcript is a complete command we can run right away."""
+        if tail or not committed: return False
+        intent, slots, conf = parse_intent(committed)
+        if intent not in EARLY_INTENTS or conf < 0.85: return False
+        if intent == "open_app":
+            app = resolve_app_name(slots.get("app_raw", "")) or ""
+            return app in APP_CANONICALS.values() or APP_NAMES.has("installed", app)
+        return True
+
+    def _remainder(self, final: str, fired: str) -> str:
+        """What the final transcript adds after a command already run from a partial.
+        Only chained commands ("... and terminal", "... then ...") are kept."""
+        fw, pw = final.split(), fired.split()
+        if [PartialTranscript.key(w) for w in fw[:len(pw)]] != [PartialTranscript.key(w) for w in pw]:
+            dbg("final transcript diverged from early command: {!r} vs {!r}".format(final, fired)); return ""
+        rest = " ".join(fw[len(pw):]).lstrip(" ,.")
+        m = LEADING_CHAIN.match(rest)
+        return rest[m.end():].strip() if m else ""
+
+    def _consume(self, seg_id: int, text: str, tail: str, final: bool) -> None:
+        if not final:
+            with self._order_lock: behind = bool(self._order)   # earlier finals (or this one) still pending
+            if not behind and seg_id not in self._fired and self._early_intent(text, tail):
+                self._fired[seg_id] = text
+                print(f"\n🎤 {text} …"); process_line(text)
+            return
+        self._results[seg_id] = text
+        while True:
+            with self._order_lock:
+                if not self._order or self._order[0] not in self._results: return
+                sid = self._order.popleft()
+            self._deliver(sid, self._results.pop(sid))
+
+    def _deliver(self, seg_id: int, text: str) -> None:
+        fired = self._fired.pop(seg_id, None)
+        if fired is not None:
+            text = self._remainder(text, fired)
+        if not text: return
+        print(f"\n🎤 {text}")
+        process_line(text)
+
     def _consumer(self):
         while self.running:
             try:
-                text = self.txt_q.get(timeout=0.25)
+                item = self.txt_q.get(timeout=0.25)
             except queue.Empty:
                 continue
             try:
-                print(f"\n🎤 {text}")
-                process_line(text)
+                self._consume(*item)
             except Exception as e:
                 log_ex(e)
 
 VOICE = VoiceEngine()
+_WHISPER_MB = {"tiny": 150, "base": 250, "small": 600, "medium": 1700, "large": 3500}
+MODELS.register("whisper", VOICE._load_models, est_mb=VOICE.n_decoders * next(
+    (mb for k, mb in _WHISPER_MB.items() if k in (os.environ.get("NEUROOS_WHISPER_PATH") or os.environ.get("NEUROOS_WHISPER_SIZE", "small.en"))), 600))
 
 # --------- CLI ----------
 CHAIN_SEPS = re.compile(r"\s*(?:;|&&| and then | then | \| )\s*", re.I)
@@ -1000,49 +3554,177 @@ Examples:
   open workspace coding | save workspace myfocus | open workspace myfocus
   send selection to notes | email selection to you@example.com subject Research
   search this (select text first)
-  take note: meeting at 6 | add fix login bug to note TODOs
+  take note: meeting at 6 | add fix login bug to note TODOs | show note history todos
   remind me in 20 seconds to stretch | remind me at 8:30 pm to practice
+  remind me every 2 hours to drink water | list reminders | snooze 10 minutes | cancel reminder 3
   ask what is a mutex? | what is the capital of India?
+  trace on | open workspace coding | trace dump | trace off
+  metrics (set NEUROOS_METRICS_PORT to scrape http://127.0.0.1:<port>/metrics)
 Type 'exit' to quit.
 """
 
+def run_command(cmd: str):
+    t0 = time.perf_counter()
+    intent, slots, _ = parse_intent(cmd)
+    METRICS.observe("neuroos_parse_seconds", time.perf_counter() - t0)
+    if not intent:
+        target = fuzzy_match_any_appphrase(normalize_text(cmd))
+        if not target:
+            METRICS.inc("neuroos_commands_total", intent="none")
+            print("[neuroos] Sorry, I didn't get that."); speak("Sorry, I didn't get that."); return
+        intent, slots = "open_app", {"app_raw": target}
+    METRICS.inc("neuroos_commands_total", intent=intent)
+    exec_action(intent, slots)
+    CTX.last_intent, CTX.last_slots = intent, slots
+    METRICS.observe("neuroos_command_seconds", time.perf_counter() - t0, intent=intent)
+
 def process_line(raw: str):
     commands = split_commands(raw)
     for cmd in commands:
         try:
-            intent, slots, _ = parse_intent(cmd)
-            if not intent:
-                target = fuzzy_match_any_appphrase(normalize_text(cmd))
-                if target:
-                    exec_action("open_app", {"app_raw": target})
-                    CTX.last_intent, CTX.last_slots = "open_app", {"app_raw": target}
-                else:
-                    print("[neuroos] Sorry, I didn't get that."); speak("Sorry, I didn't get that.")
-                continue
-            exec_action(intent, slots)
-            CTX.last_intent, CTX.last_slots = intent, slots
+            with TRACE.span("command", text=cmd): run_command(cmd)
         except Exception as e:
-            log_ex(e); print("[neuroos] (handled error)")
+            METRICS.inc("neuroos_command_errors_total"); log_ex(e); print("[neuroos] (handled error)")
+
+# --------- daemon ----------
+SOCKET_PATH = os.environ.get("NEUROOS_SOCKET") or os.path.join(DATA_DIR, "neuroos.sock")
+ADDR_FILE = os.path.join(DATA_DIR, "neuroos.addr")   # "host:port token" where there are no unix sockets
+
+class ClientSink:
+    """Output of one client request. The handler thread and the LLM job threads it started write here."""
+    def __init__(self, conn: Any):
+        self.conn = conn; self.jobs: List[LLMJob] = []; self.gone = False
+        self._lock = threading.Lock()
+    def write(self, text: str) -> int:
+        with self._lock:
+            if not self.gone:
+                try: self.conn.sendall(text.encode("utf-8"))
+                except OSError: self.gone = True   # client went away; the command still finishes
+        return len(text)
+    def flush(self) -> None:
+        pass
+
+class ClientOutput:
+    """Stands in for sys.stdout while serving: prints from a thread bound to a client go to
+    that client, everything else (reminders, voice) to the daemon's own stdout."""
+    def __init__(self):
+        self.real = sys.stdout
+        self._local = threading.local()
+    def current(self) -> Optional[ClientSink]:
+        return getattr(self._local, "sink", None)
+    def within(self, sink: Optional[ClientSink], fn: Optional[Callable]) -> Optional[Callable]:
+        """fn, printing to `sink` from whichever thread calls it."""
+        if sink is None or fn is None: return fn
+        def bound(*a):
+            prev = self.current(); self._local.sink = sink
+            try: return fn(*a)
+            finally: self._local.sink = prev
+        return bound
+    def write(self, text: str) -> int:
+        return (self.current() or self.real).write(text)
+    def flush(self) -> None:
+        (self.current() or self.real).flush()
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.real, name)
+
+CLIENT_OUT = ClientOutput()
+_SERVE_LOCK = threading.Lock()   # one command at a time against CTX; LLM answers stream outside it
+
+def serve(path: str = SOCKET_PATH):
+    """Keeps models, CTX, the app catalog and timers resident and runs command lines sent by
+    src/client.py, one thread per connection. Listens on a unix socket (mode 0600), or where
+    there are none on 127.0.0.1 with a random port and token in ADDR_FILE."""
+    import socket, socketserver   # not imported at startup: only the daemon needs them
+    class ClientHandler(socketserver.StreamRequestHandler):
+        """One connection = one command line; its output streams back, then the connection closes."""
+        def handle(self):
+            token = getattr(self.server, "token", None)
+            if token is not None and self.rfile.readline(256).decode("utf-8", "replace").strip() != token: return
+            raw = self.rfile.readline(1 << 16).decode("utf-8", "replace").strip()
+            sink = ClientSink(self.connection)
+            def run():
+                if raw.lower() in ("exit", "quit"): print("[neuroos] (the daemon keeps running; stop it with Ctrl+C)"); return
+                with _SERVE_LOCK: process_line(raw)
+            if raw: CLIENT_OUT.within(sink, run)()
+            for job in sink.jobs:   # stream LLM answers until done, or until the client hangs up
+                while not job.done.wait(0.5):
+                    if sink.gone or self._hung_up(): job.cancel(); break
+        def _hung_up(self) -> bool:
+            import select
+            try:
+                if not select.select([self.connection], [], [], 0)[0]: return False
+                return self.connection.recv(1, socket.MSG_PEEK) == b""
+            except OSError:
+                return True
+    Path(DATA_DIR).mkdir(parents=True, exist_ok=True)
+    if hasattr(socket, "AF_UNIX"):
+        if os.path.exists(path):
+            try:
+                with socket.socket(socket.AF_UNIX) as probe: probe.connect(path)
+                print(f"[neuroos] A daemon is already listening on {path}."); return
+            except OSError:
+                os.unlink(path)   # left by a daemon that did not exit cleanly
+        old = os.umask(0o077)
+        try: srv = socketserver.ThreadingUnixStreamServer(path, ClientHandler, bind_and_activate=False); srv.server_bind(); srv.server_activate()
+        finally: os.umask(old)
+        where = addr_file = path
+    else:
+        import secrets
+        srv = socketserver.ThreadingTCPServer(("127.0.0.1", 0), ClientHandler); srv.token = secrets.token_hex(16)
+        with open(ADDR_FILE, "w", encoding="utf-8") as f: f.write("{}:{} {}".format(*srv.server_address, srv.token))
+        where = "{}:{}".format(*srv.server_address); addr_file = ADDR_FILE
+    srv.daemon_threads = True
+    def stop(*_): raise KeyboardInterrupt
+    import signal
+    signal.signal(signal.SIGTERM, stop)   # `kill` cleans up like Ctrl+C
+    sys.stdout = CLIENT_OUT
+    print(f"[neuroos] Daemon listening on {where} (send commands with: python src/client.py <command>)")
+    try:
+        srv.serve_forever(poll_interval=0.5)
+    except KeyboardInterrupt:
+        print("\nbye.")
+    finally:
+        srv.server_close(); sys.stdout = CLIENT_OUT.real
+        try: os.unlink(addr_file)
+        except OSError: pass
+        VOICE.stop(); NOTE_WRITER.close()
 
 def main():
-    print(BANNER)
+    print(BANNER if not args.serve else "NeuroOS daemon")
     sysname = platform.system()
     print("[neuroos] OS: {} | Voice model: {} | compute: {}".format(
         sysname, os.environ.get('NEUROOS_WHISPER_PATH') or os.environ.get('NEUROOS_WHISPER_SIZE','small.en'),
         os.environ.get('NEUROOS_WHISPER_COMPUTE','int8')
     ))
     print(LLM.status())
+    APP_CATALOG.load(); STARTUP.mark("app catalog load")
+    REMINDERS.start(); STARTUP.mark("reminders")
+    def background():   # after the prompt is up: model imports would otherwise hold the GIL before it
+        MODELS.start([n.strip() for n in os.environ.get("NEUROOS_PRELOAD", "whisper,llm").split(",") if n.strip()])
+        APP_CATALOG.start(load=False)
+        NOTES.start()
+    port = int(os.environ.get("NEUROOS_METRICS_PORT", "0") or 0)
+    if port:
+        try: print("[neuroos] metrics at http://127.0.0.1:{}/metrics".format(serve_metrics(port).server_port))
+        except OSError as e: log_ex(e)
+    if args.serve: background(); serve(); return
+    STARTUP.mark("first prompt")
+    if args.profile_startup:
+        STARTUP.report(("plyer", "pyperclip", "pyautogui", "numpy", "sounddevice", "webrtcvad", "faster_whisper", "ctranslate2", "transformers", "torch"))
+    threading.Thread(target=background, name="neuroos-startup", daemon=True).start()
     while True:
         try:
             raw = input("> ")
         except (EOFError, KeyboardInterrupt):
-            print("\nbye."); VOICE.stop(); return
+            print("\nbye."); VOICE.stop(); NOTE_WRITER.close(); return
         except Exception as e:
             log_ex(e); continue
         if not raw: continue
         if raw.strip().lower() in ("exit","quit"):
-            VOICE.stop(); print("bye."); return
+            VOICE.stop(); NOTE_WRITER.close(); print("bye."); return
         process_line(raw)
 
+STARTUP.mark("module body")
+
 if __name__ == "__main__":
     main()